@@ -9,6 +9,19 @@ cors = CORS(app, resources={r"/api/*": {"origins": "*"}})
 app.config.from_mapping(
     SECRET_KEY='dev',
     DATABASE=os.path.join(app.instance_path, 'flaskr.sqlite'),
+    SELECTED_CARD_CACHE_SIZE=256,
+    # Card store written by the DB Manager's cards update, used to look up selected cards by scryfallOracleId or name
+    CARD_STORE_PATH='./app/data/AtomicCards.cardstore',
+    RESPONSE_CACHE_SIZE=256,
+    # Seconds between checks of the data-version stamp that invalidates cached responses
+    DATA_VERSION_TTL=5,
+    # Cards per page (at most) and per DB cursor batch for /api/gatherCards
+    GATHER_CARDS_MAX_LIMIT=1000,
+    GATHER_CARDS_BATCH_SIZE=500,
+    # Responses smaller than this (in bytes) are sent uncompressed
+    COMPRESSION_MIN_SIZE=1024,
+    COMPRESSION_GZIP_LEVEL=6,
+    COMPRESSION_BROTLI_QUALITY=5,
 )
 
 with open('./config.yaml', 'r') as f:
@@ -20,6 +33,34 @@ client = MongoClient("mongodb+srv://%s:%s@%s?retryWrites=true&w=majority" %
 db = client["MetaSynDB"]
 all_cards = db.AllCards
 
+from app.card_index import CardIndex
+card_index = CardIndex(all_cards, app.config['SELECTED_CARD_CACHE_SIZE'], app.config['CARD_STORE_PATH'])
+
+from app.keyword_matcher import KeywordMatcherLoader
+# The keyword vocabulary is compiled into a single automaton on first use
+keyword_matchers = KeywordMatcherLoader(db.keywords)
+
+from app.synergy_index import SynergyIndex
+synergy_index = SynergyIndex(db.synergies)
+
+from app.inverted_index import CardInvertedIndex
+card_pool = CardInvertedIndex(all_cards, db.types, keyword_matchers)
+
+from app.response_cache import DataVersion, ResponseCache
+# Reference data only changes when the DB Manager syncs, which bumps the data version
+data_version = DataVersion(db.meta, app.config['DATA_VERSION_TTL'])
+response_cache = ResponseCache(data_version, app.config['RESPONSE_CACHE_SIZE'])
+# After a sync: rebuild the keyword automaton (on next use), rebuild the card indexes in the background (the
+# previous ones keep serving until then) and drop cached card profiles
+data_version.on_change(keyword_matchers.invalidate)
+data_version.on_change(card_pool.refresh)
+data_version.on_change(card_index.clear)
+app.before_request(data_version.check)
+
+from app.serialization import compress_response
+# gzip/brotli, negotiated from each request's Accept-Encoding
+app.after_request(compress_response)
+
 
 # ensure instance folder exists
 try:
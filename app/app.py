@@ -1,15 +1,15 @@
-import requests
 from yaml import load, Loader
 from mtgsdk import Card
 
 from synergy import CardSynergy
+from mtg_collections import http_client
 
 
 def create_app(test_config=None):
 
     def retrieve_all_types():
         print("Downloading MTG types data...")
-        types_req = requests.get('https://api.magicthegathering.io/v1/types')
+        types_req = http_client.get('https://api.magicthegathering.io/v1/types')
         if types_req.status_code == 200:
             with open('./data/types.yaml', 'w') as f:
                 f.write(str(types_req.json()))
@@ -18,7 +18,7 @@ def create_app(test_config=None):
 
     def retrieve_all_sets():
         print("Downloading MTG sets data...")
-        sets_req = requests.get('https://api.magicthegathering.io/v1/sets')
+        sets_req = http_client.get('https://api.magicthegathering.io/v1/sets')
         if sets_req.status_code == 200:
             with open('./data/sets.yaml', 'w') as f:
                 f.write(str(sets_req.json()))
@@ -27,7 +27,7 @@ def create_app(test_config=None):
 
     def retrieve_all_keywords():
         print("Downloading MTG keywords data...")
-        keywords_req = requests.get('https://mtgjson.com/api/v5/Keywords.json')
+        keywords_req = http_client.get('https://mtgjson.com/api/v5/Keywords.json')
         if keywords_req.status_code == 200:
             with open('./data/keywords.yaml', 'w') as f:
                 f.write(str(keywords_req.json()))
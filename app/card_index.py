@@ -0,0 +1,95 @@
+from functools import lru_cache
+from typing import Collection
+
+from mtgsdk import Card
+
+from app.metasyn import color_mask
+from app.mtg_collections.card_store import CardStore
+from app.projections import CARD_PROFILE_PROJECTION
+
+###
+# Normalized view of a selected card. Resolved once and reused for every comparison in a request
+###
+class CardProfile():
+    def __init__(self, card: dict):
+        self.name = card.get('name')
+        self.color_identity = card.get('colorIdentity') or []
+        self.colors = card.get('colors') or []
+        self.types = card.get('types') or []
+        self.subtypes = card.get('subtypes') or []
+        self.keywords = card.get('keywords') or []
+        self.text = card.get('text')
+        self.color_mask = color_mask(self.color_identity)
+
+    @classmethod
+    def from_sdk_card(cls, card: Card):
+        return cls({
+            "name": card.name,
+            "colorIdentity": card.color_identity,
+            "colors": card.colors,
+            "types": card.types,
+            "subtypes": card.subtypes,
+            "text": card.text
+        })
+
+###
+# In-process lookup of selected cards backed by the AllCards collection (by multiverseId), then by the local card
+# store written by the DB Manager (by scryfallOracleId or name), then by magicthegathering.io
+# Keeps a bounded LRU of resolved CardProfiles so repeated clicks on the same card never leave the process
+###
+class CardIndex():
+    _projection = CARD_PROFILE_PROJECTION
+
+    def __init__(self, collection: Collection, max_profiles: int=256, card_store_path: str=None):
+        self.collection = collection
+        self.card_store_path = card_store_path
+        self.__card_store = None
+        self.get_profile = lru_cache(maxsize=max_profiles)(self.__resolve_profile)
+
+    ###
+    # Private methods
+    ###
+    def __find_card(self, card_id: str) -> dict:
+        # multiverseId may have been stored as either a str or an int
+        card_ids = [card_id]
+        try:
+            card_ids.append(int(card_id))
+        except (TypeError, ValueError):
+            pass
+        return self.collection.find_one({"multiverseId": {"$in": card_ids}}, self._projection)
+
+    def __get_card_store(self) -> CardStore:
+        # Mapped on first use (and again after clear()). Returns None if there is no card store
+        card_store = self.__card_store
+        if card_store is None and self.card_store_path is not None:
+            try:
+                card_store = self.__card_store = CardStore(self.card_store_path)
+            except (FileNotFoundError, ValueError) as e:
+                print("Card store unavailable:", e)
+        return card_store
+
+    def __find_stored_card(self, card_id: str) -> dict:
+        card_store = self.__get_card_store()
+        if card_store is None or card_id is None:
+            return None
+        # Every face of a multi-faced card matches its scryfallOracleId (or full name); the first face is used
+        cards = card_store.find_by_oracle_id(card_id) or card_store.find_by_name(card_id)
+        return cards[0] if cards else None
+
+    def __resolve_profile(self, card_id: str) -> CardProfile:
+        card = self.__find_card(card_id)
+        if card is None:
+            card = self.__find_stored_card(card_id)
+        if card is None:
+            print(f"{card_id} not found in AllCards. Requesting card from magicthegathering.io...")
+            return CardProfile.from_sdk_card(Card.find(card_id))
+        return CardProfile(card)
+
+    ###
+    # Utility Methods
+    ###
+    def clear(self) -> None:
+        # The card store is remapped on next use, since a sync may have replaced it. Requests still reading the
+        # previous mapping keep it until they are done
+        self.__card_store = None
+        self.get_profile.cache_clear()
@@ -13,7 +13,14 @@ from app.mtg_collections.mtg_types import TypesUpdater
 
 from pymongo import MongoClient
 
+from app.mtg_collections.indexes import (ensure_indexes, explain_queries, get_index_specs, print_explain_report,
+    print_index_report)
+from app.mtg_collections.scheduler import UpdateScheduler
 from app.mtg_collections.update import IUpdater
+from app.inverted_index import CardInvertedIndex
+from app.keyword_matcher import KeywordMatcherLoader
+from app.response_cache import DataVersion
+from app.synergy_index import SYNERGY_INDEX_K, SynergyIndexBuilder
 
 def get_default_config() -> dict:
     with open('./config.yaml', 'r') as f:
@@ -129,17 +136,10 @@ class Manager():
         print("\n-- MetaSynDB Manager: Manual --\nAvailable commands:\n\n" + 
             "exit - Close the DB Manager cli.\n" +
             "get dates - Prints dates that each db collection was last updated.\n" +
-            "update all - Updates all db collections.\n\n"),
-
-    def __get_outdated_collections(self) -> dict:
-        outdated_collections = {}
-        for coll in self.updaters:
-            if self.updaters[coll].is_outdated():
-                outdated_collections[coll] = self.updaters[coll].local.get_date()
-        if outdated_collections.__len__() == 0:
-            return None
-        else:
-            return outdated_collections
+            "update all - Updates all db collections.\n" +
+            "build synergy index - Precomputes each card's top synergy partners.\n" +
+            "ensure indexes - Creates any missing DB indexes.\n" +
+            "explain queries - Reports API queries that are not backed by an index.\n\n"),
 
     def update(self, data_set: str) -> NoneType:
         print("Updating %s data" % data_set)
@@ -152,19 +152,43 @@ class Manager():
             else:
                 raise Exception("Error while updating %s data set: %s" % (data_set, e))
 
+    def export_json(self, data_set: str) -> str:
+        # Writes a JSON copy of a data set's local data for debugging
+        try:
+            return self.updaters[data_set].local.export_json()
+        except KeyError:
+            print("Invalid data set entered. Please enter a valid option:", self.updaters.keys())
+
     def update_all(self) -> NoneType:
+        # Downloads, formats and syncs every collection concurrently (see UpdateScheduler)
         print("\n--- Updating All Collections ---")
-        outdated_collections = self.__get_outdated_collections()
-        if outdated_collections:
-            for i in outdated_collections:
-                print("\n%s data is out of date. Updating %s Collection" % (i, i))
-                updater = self.updaters[i]
-                updater.update_local_data()
-        else:
-            print("No collections to update. All data is up-to-date.")
-            self.print_all_dates()
-        for upd8r in self.updaters:
-            self.updaters[upd8r].sync()
+        self.ensure_indexes()
+        UpdateScheduler(self.updaters).run()
+        self.build_synergy_index()
+        self.bump_data_version()
+
+    def bump_data_version(self) -> int:
+        # Invalidates the API's cached responses (see response_cache.ResponseCache)
+        return DataVersion(self.__get_mongodb_collection('meta')).bump()
+
+    def ensure_indexes(self) -> dict:
+        # Idempotent: only indexes that don't exist yet are created (see indexes.INDEX_SPECS)
+        report = ensure_indexes(self.client, get_index_specs(self.updaters))
+        print_index_report(report)
+        return report
+
+    def explain_queries(self) -> list:
+        results = explain_queries(self.client)
+        print_explain_report(results)
+        return results
+
+    def build_synergy_index(self, k: int=SYNERGY_INDEX_K) -> int:
+        print("\n--- Building Synergy Index ---")
+        # The same card pool (and keyword matcher) the API prunes whole-pool requests with
+        pool = CardInvertedIndex(self.__get_mongodb_collection('AllCards'), self.__get_mongodb_collection('types'),
+            KeywordMatcherLoader(self.__get_mongodb_collection('keywords'))).get()
+        builder = SynergyIndexBuilder(pool, self.__get_mongodb_collection('synergies'), k)
+        return builder.build()
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -191,7 +215,10 @@ if __name__ == "__main__":
             while user_input != "exit":
                 switch = {
                     "help": mgr.print_help,
-                    "get dates": mgr.print_dates
+                    "get dates": mgr.print_dates,
+                    "build synergy index": mgr.build_synergy_index,
+                    "ensure indexes": mgr.ensure_indexes,
+                    "explain queries": mgr.explain_queries
                 }
                 try:
                     cmd = switch.get(user_input)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from app.keyword_matcher import KeywordMatcher
+from app.metasyn import color_masks
+
+# Number of set bits for every possible byte value
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    # Number of set bits in each row of a packed (N x W) uint8 bitset array
+    return _POPCOUNT_TABLE[bits].sum(axis=-1, dtype=np.int64)
+
+###
+# Columnar view over a list of card dicts (as returned by /api/gatherCards)
+# Only the attributes synergy is scored on are converted, each once into an array, so whole sets can be scored
+# with NumPy operations
+###
+class CardFeatures():
+    def __init__(self, cards: list, keyword_matcher: KeywordMatcher):
+        self.names = [card.get('name') for card in cards]
+        self.color_masks = color_masks(card.get('colors') for card in cards)
+        # Keywords found in each card's text (plus its listed keywords), scanned once per card
+        self.keyword_bits = keyword_matcher.pack(cards)
+
+    def __len__(self) -> int:
+        return len(self.names)
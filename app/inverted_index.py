@@ -0,0 +1,144 @@
+from collections import defaultdict
+from threading import Lock, Thread
+from typing import Collection, Iterable
+
+from app.keyword_matcher import KeywordMatcher, KeywordMatcherLoader
+from app.metasyn import ALL_COLORS_MASK, color_mask
+
+###
+# Immutable snapshot of the card pool used to prune synergy candidates: the AllCards cards (one per name), the
+# KeywordMatcher and the in-memory inverted indexes built with it:
+#   keyword id -> card ids, type/subtype -> card ids, color mask -> card ids
+# Card ids are positions in self.cards. A request keeps using the same snapshot, so matcher bit positions, posting
+# ids and cards always come from one build
+###
+class CardPool():
+    def __init__(self, cards: list, keyword_matcher: KeywordMatcher, known_types: set):
+        self.cards = cards
+        self.keyword_matcher = keyword_matcher
+        by_keyword = defaultdict(set)
+        by_type = defaultdict(set)
+        by_color = defaultdict(set)
+        for card_id, card in enumerate(cards):
+            bits = keyword_matcher.card_bits(card)
+            while bits:
+                low_bit = bits & -bits
+                by_keyword[low_bit.bit_length() - 1].add(card_id)
+                bits ^= low_bit
+            for card_type in (card.get('types') or []) + (card.get('subtypes') or []):
+                if card_type in known_types:
+                    by_type[card_type].add(card_id)
+            by_color[color_mask(card.get('colorIdentity'))].add(card_id)
+        self.by_keyword, self.by_type, self.by_color = dict(by_keyword), dict(by_type), dict(by_color)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def candidates(self, keyword_bits: int, subtypes: Iterable[str]=(), color_identity: int=ALL_COLORS_MASK) -> set:
+        ###
+        # Card ids that share at least one keyword or subtype with the selected card (union of posting lists)
+        # If none do (e.g. a vanilla card), falls back to the cards whose color identity fits within the selected
+        # card's color_identity (union of color postings), which are the cards with the highest color synergy
+        ###
+        candidate_ids = set()
+        while keyword_bits:
+            low_bit = keyword_bits & -keyword_bits
+            candidate_ids |= self.by_keyword.get(low_bit.bit_length() - 1, set())
+            keyword_bits ^= low_bit
+        for subtype in subtypes or []:
+            candidate_ids |= self.by_type.get(subtype, set())
+        if not candidate_ids:
+            for mask, card_ids in self.by_color.items():
+                if mask & ~color_identity == 0:
+                    candidate_ids |= card_ids
+        return candidate_ids
+
+    def get_cards(self, card_ids: Iterable[int]) -> list:
+        return [self.cards[card_id] for card_id in sorted(card_ids)]
+
+    def get_candidate_cards(self, selected_name: str, keyword_bits: int, subtypes: Iterable[str]=(),
+            color_identity: int=ALL_COLORS_MASK) -> list:
+        cards = self.get_cards(self.candidates(keyword_bits, subtypes, color_identity))
+        return [card for card in cards if card.get('name') != selected_name]
+
+###
+# Holds the current CardPool, built from the AllCards and types collections (maintained by TypesUpdater)
+# get() builds it on first use (or after invalidate()). refresh() rebuilds it in the background while the current
+# snapshot keeps serving requests, then swaps it in with a single assignment
+###
+class CardInvertedIndex():
+    _projection = {
+        '_id': 0,
+        'name': 1,
+        'colorIdentity': 1,
+        'colors': 1,
+        'types': 1,
+        'subtypes': 1,
+        'keywords': 1,
+        'text': 1
+    }
+
+    def __init__(self, cards_collection: Collection, types_collection: Collection,
+            keyword_matchers: KeywordMatcherLoader):
+        self.cards_collection = cards_collection
+        self.types_collection = types_collection
+        self.keyword_matchers = keyword_matchers
+        self.__pool = None
+        self._lock = Lock()
+
+    ###
+    # Private methods
+    ###
+    def __get_known_types(self) -> set:
+        # Types and subtypes maintained by TypesUpdater
+        known_types = set()
+        for card_type in self.types_collection.find({}, {"_id": 0, "type": 1, "subtypes": 1}):
+            known_types.add(card_type['type'])
+            known_types.update(card_type.get('subtypes') or [])
+        return known_types
+
+    def __load(self) -> CardPool:
+        print("Building card inverted indexes...")
+        unique_cards = {}
+        for card in self.cards_collection.find({}, self._projection):
+            # AllCards may hold one document per printing, but synergy only depends on the card itself
+            unique_cards.setdefault(card.get('name'), card)
+        pool = CardPool(list(unique_cards.values()), self.keyword_matchers.get(), self.__get_known_types())
+        print(f"Indexed {len(pool)} cards")
+        return pool
+
+    def __rebuild(self) -> None:
+        try:
+            with self._lock:
+                self.__pool = self.__load()
+        except Exception as e:
+            print("Unable to rebuild card inverted indexes:", e)
+
+    ###
+    # Utility Methods
+    ###
+    def get(self) -> CardPool:
+        pool = self.__pool
+        if pool is None:
+            with self._lock:
+                if self.__pool is None:
+                    self.__pool = self.__load()
+                pool = self.__pool
+        return pool
+
+    def invalidate(self) -> None:
+        # The next get() rebuilds the pool
+        with self._lock:
+            self.__pool = None
+
+    def refresh(self) -> Thread:
+        # Rebuilds the pool in a background thread (e.g. after a sync). get() returns the current pool until then
+        thread = Thread(target=self.__rebuild, daemon=True)
+        thread.start()
+        return thread
+
+    def warm(self) -> Thread:
+        # Builds the pool in a background thread (e.g. at startup), so the first request doesn't have to
+        thread = Thread(target=self.get, daemon=True)
+        thread.start()
+        return thread
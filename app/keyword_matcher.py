@@ -0,0 +1,120 @@
+from collections import deque
+from threading import Lock
+from typing import Collection, Iterable
+
+import numpy as np
+
+###
+# Aho-Corasick automaton over the full keyword vocabulary (abilityWords, keywordAbilities & keywordActions)
+# Scans a card's text once, in linear time, into a keyword bitset where bit N is set if self.keywords[N] is found
+###
+class KeywordMatcher():
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted(set(keywords))
+        self.ids = {keyword.lower(): i for i, keyword in enumerate(self.keywords)}
+        self.width = (len(self.keywords) + 7) // 8
+        self.__build_automaton()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    @classmethod
+    def from_collection(cls, collection: Collection):
+        return cls(collection.distinct('keyword'))
+
+    ###
+    # Private methods
+    ###
+    def __build_automaton(self) -> None:
+        # Trie of lowercased keywords
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(keyword_id)
+        # Breadth-first pass to add failure links, merging the outputs of each node's failure target
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(char, 0)
+                self._out[next_node] = self._out[next_node] + self._out[self._fail[next_node]]
+        self._lengths = [len(keyword) for keyword in self.keywords]
+
+    ###
+    # Utility Methods
+    ###
+    def scan(self, text: str) -> int:
+        # Only whole-word matches count (e.g. "Flash" does not match inside "Flashback")
+        if not text:
+            return 0
+        text = text.lower()
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        bits = 0
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword_id in out[node]:
+                start = i - lengths[keyword_id] + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (i + 1 == len(text) or not text[i + 1].isalnum()):
+                    bits |= 1 << keyword_id
+        return bits
+
+    def bits(self, keywords: Iterable[str]) -> int:
+        # Bitset for a card's listed keywords. Keywords outside the vocabulary are ignored
+        bits = 0
+        for keyword in keywords or []:
+            keyword_id = self.ids.get(keyword.lower())
+            if keyword_id is not None:
+                bits |= 1 << keyword_id
+        return bits
+
+    def card_bits(self, card: dict) -> int:
+        return self.scan(card.get('text')) | self.bits(card.get('keywords'))
+
+    def pack(self, cards: list) -> np.ndarray:
+        # N x width array of packed keyword bitsets (bit N of a bitset is bit N % 8 of byte N // 8)
+        packed = b"".join(self.card_bits(card).to_bytes(self.width, 'little') for card in cards)
+        return np.frombuffer(packed, dtype=np.uint8).reshape(len(cards), self.width)
+
+    def names(self, bits: int) -> list:
+        return [keyword for i, keyword in enumerate(self.keywords) if bits >> i & 1]
+
+###
+# Builds the KeywordMatcher from the keywords collection on first use (rather than when the app is imported),
+# and again after invalidate()
+###
+class KeywordMatcherLoader():
+    def __init__(self, collection: Collection):
+        self.collection = collection
+        self.__matcher = None
+        self.__lock = Lock()
+
+    def get(self) -> KeywordMatcher:
+        matcher = self.__matcher
+        if matcher is None:
+            with self.__lock:
+                if self.__matcher is None:
+                    self.__matcher = KeywordMatcher.from_collection(self.collection)
+                matcher = self.__matcher
+        return matcher
+
+    def invalidate(self) -> None:
+        with self.__lock:
+            self.__matcher = None
@@ -1,33 +1,62 @@
-from collections import namedtuple
-from itertools import combinations
+from typing import Iterable, Union
 
-from mtgsdk import Card
+import numpy as np
+
+###
+# Color identities are stored as 5-bit masks (one bit per color in WUBRG order)
+# Colorless cards have a mask of 0
+###
+MTG_COLORS = ('W', 'U', 'B', 'R', 'G')
+COLOR_BITS = {color: 1 << i for i, color in enumerate(MTG_COLORS)}
+COLOR_BITS.update({'White': COLOR_BITS['W'], 'Blue': COLOR_BITS['U'], 'Black': COLOR_BITS['B'],
+                   'Red': COLOR_BITS['R'], 'Green': COLOR_BITS['G']})
+ALL_COLORS_MASK = (1 << len(MTG_COLORS)) - 1
+
+def color_mask(colors: Union[Iterable[str], str, None]) -> int:
+  # Accepts color letters ("B"), color names ("Black"), or a joined identity string ("BR")
+  if not colors:
+    return 0
+  if isinstance(colors, str):
+    colors = [colors] if colors in COLOR_BITS else list(colors)
+  mask = 0
+  for color in colors:
+    mask |= COLOR_BITS[color]
+  return mask
+
+def color_masks(colors_lists: Iterable) -> np.ndarray:
+  return np.fromiter((color_mask(colors) for colors in colors_lists), dtype=np.uint8)
+
+def _mask_to_combo_name(mask: int) -> str:
+  # Combo names keep the original alphabetical ordering (e.g. "BGR")
+  return "".join(sorted(color for color in MTG_COLORS if mask & COLOR_BITS[color]))
+
+def _build_color_tables():
+  masks = np.arange(ALL_COLORS_MASK + 1)
+  # compat[a][c] is True when color identity a fits within color combo c (a is a subset of c)
+  # Colorless (0) fits every combo, and 0 itself is not a color combo
+  compat = (masks[:, None] & ~masks[None, :] & ALL_COLORS_MASK) == 0
+  compat[:, 0] = False
+  # scores[a][b] is the number of color combos that both identities fit within
+  scores = compat.astype(np.int64) @ compat.T.astype(np.int64)
+  return compat, scores
+
+# Precomputed once at import; every pairwise color score is a single table lookup
+COLOR_COMPAT_TABLE, COLOR_SYNERGY_TABLE = _build_color_tables()
+COLOR_COMBOS = {mask: _mask_to_combo_name(mask) for mask in range(1, ALL_COLORS_MASK + 1)}
+
+def color_synergy(mask_a, mask_b):
+  # Works with int masks or (broadcastable) arrays of masks
+  scores = COLOR_SYNERGY_TABLE[mask_a, mask_b]
+  if np.ndim(scores) == 0:
+    return int(scores)
+  return scores
 
 class Utils():
-  
+
   def get_color_synergies(self, colors_list):
-    print(colors_list)
-    mtg_colors = ('B', 'G', 'R', 'U', 'W')
-    normalized_mtg_colors = "".join(mtg_colors)
-    normalized_color_identity = "".join(colors_list)
-    color_combos = {}
-    two_clr_combos = combinations(normalized_mtg_colors, 2)
-    three_clr_combos = combinations(normalized_mtg_colors, 3)
-    four_clr_combos = combinations(normalized_mtg_colors, 4)
-    
-    for i in mtg_colors: color_combos[i] = False
-    for j in list(two_clr_combos): color_combos["".join(j)] = False
-    for k in list(three_clr_combos): color_combos["".join(k)] = False
-    for l in list(four_clr_combos): color_combos["".join(l)] = False
-    color_combos[normalized_mtg_colors] = False
-    for combo in color_combos:
-      # Check if card is colorless. If so, card synergizes with all color combos
-      if colors_list is None:
-        color_combos[combo] = True
-      # Mark matching color combos as True if the card's color identity is found to match at least a subset of colors in a color combo
-      # Example 1: "B" matches "B" & "BW" color combos
-      # Example 2: "UW" does NOT match "U" or "W", but does match "UW" and "URW"
-      elif normalized_color_identity in combo:
-        color_combos[combo] = True
-    
-    return color_combos
+    # Mark matching color combos as True if the card's color identity is a subset of the colors in a color combo
+    # Colorless cards synergize with all color combos
+    # Example 1: "B" matches "B" & "BW" color combos
+    # Example 2: "BR" does NOT match "B" or "R", but does match "BR" and "BGR"
+    compat = COLOR_COMPAT_TABLE[color_mask(colors_list)]
+    return {name: bool(compat[mask]) for mask, name in COLOR_COMBOS.items()}
@@ -0,0 +1,118 @@
+# Chunked, unordered and concurrent bulk writes for the Updaters
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Collection, Iterable, Iterator
+import random
+import time
+
+from pymongo.errors import AutoReconnect, BulkWriteError, ExecutionTimeout, NetworkTimeout
+
+# Errors that are worth retrying (connection hiccups, elections, timeouts)
+TRANSIENT_ERRORS = (AutoReconnect, NetworkTimeout, ExecutionTimeout)
+DUPLICATE_KEY_ERROR = 11000
+
+def iter_batches(operations: Iterable, batch_size: int) -> Iterator[list]:
+    operations = iter(operations)
+    batch = list(islice(operations, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(operations, batch_size))
+
+###
+# Results of a whole bulk write, including timing and errors for each batch
+###
+class BulkReport():
+    _counts = ("inserted", "upserted", "modified", "deleted")
+
+    def __init__(self):
+        self.batches = []
+        self.start = datetime.now()
+        self.end = None
+
+    def __str__(self) -> str:
+        totals = self.get_totals()
+        return "%s in %s batches (%s)" % (", ".join("%s: %s" % (key, totals[key]) for key in totals),
+            len(self.batches), self.end - self.start if self.end else "in progress")
+
+    def add_batch(self, batch: dict) -> None:
+        self.batches.append(batch)
+
+    def get_totals(self) -> dict:
+        totals = {key: sum(batch[key] for batch in self.batches) for key in self._counts}
+        totals["duplicates"] = sum(batch["duplicates"] for batch in self.batches)
+        totals["errors"] = sum(len(batch["errors"]) for batch in self.batches)
+        return totals
+
+    def get_errors(self) -> list:
+        return [error for batch in self.batches for error in batch["errors"]]
+
+    def print_batches(self) -> None:
+        for batch in self.batches:
+            print("  Batch %s: %s ops in %.3fs (%s attempt(s)) %s" % (batch["batch"], batch["size"], batch["seconds"],
+                batch["attempts"], {key: batch[key] for key in self._counts + ("duplicates",)}))
+            for error in batch["errors"]:
+                print("    Error:", error)
+
+###
+# Splits operations into batches of batch_size and sends them as unordered bulk_writes from a small pool of workers
+# Transient errors are retried with jittered exponential backoff. Duplicate key errors are counted, not retried
+###
+class BulkWriter():
+    def __init__(self, collection: Collection, batch_size: int=1000, workers: int=4, retries: int=3,
+            backoff: float=0.5):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+
+    ###
+    # Private methods
+    ###
+    def __sleep_before_retry(self, attempt: int) -> None:
+        time.sleep(self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+    def __write_batch(self, batch_number: int, batch: list) -> dict:
+        result = {"batch": batch_number, "size": len(batch), "attempts": 0, "inserted": 0, "upserted": 0,
+            "modified": 0, "deleted": 0, "duplicates": 0, "errors": []}
+        start = time.perf_counter()
+        while True:
+            result["attempts"] += 1
+            try:
+                db_results = self.collection.bulk_write(batch, ordered=False)
+                result.update(inserted=db_results.inserted_count, upserted=db_results.upserted_count,
+                    modified=db_results.modified_count, deleted=db_results.deleted_count)
+                break
+            except BulkWriteError as e:
+                # Unordered writes apply every operation that did not fail
+                details = e.details
+                write_errors = details.get('writeErrors', [])
+                duplicates = [error for error in write_errors if error.get('code') == DUPLICATE_KEY_ERROR]
+                result.update(inserted=details.get('nInserted', 0), upserted=details.get('nUpserted', 0),
+                    modified=details.get('nModified', 0), deleted=details.get('nRemoved', 0),
+                    duplicates=len(duplicates))
+                result["errors"] = [error.get('errmsg') for error in write_errors if error not in duplicates]
+                result["errors"] += [error.get('errmsg') for error in details.get('writeConcernErrors', [])]
+                break
+            except TRANSIENT_ERRORS as e:
+                if result["attempts"] > self.retries:
+                    result["errors"] = [str(e)]
+                    break
+                print("Transient error on batch %s (attempt %s): %s. Retrying..." % (batch_number, result["attempts"], e))
+                self.__sleep_before_retry(result["attempts"])
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    ###
+    # Utility Methods
+    ###
+    def write(self, operations: Iterable) -> BulkReport:
+        report = BulkReport()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.__write_batch, i, batch)
+                for i, batch in enumerate(iter_batches(operations, self.batch_size))]
+            for future in futures:
+                report.add_batch(future.result())
+        report.end = datetime.now()
+        return report
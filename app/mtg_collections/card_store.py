@@ -0,0 +1,127 @@
+from typing import Iterable
+import hashlib
+import mmap
+import os
+import struct
+
+import msgpack
+
+###
+# Memory-mapped, read-only card store with sorted offset indexes for random access by scryfallOracleId or name
+#
+# File layout:
+#   header: b"MSCS" | version u32 | record count u32 | oracle index offset u64 | name index offset u64 | entry counts u32 x2
+#   records: msgpack card records, back to back
+#   oracle index & name index: fixed 32 byte entries sorted by key digest:
+#       blake2b(key, 16 bytes) | record offset u64 | record length u32 | padding u32
+#
+# Because the file is mmap-backed, the OS page cache is shared by every process (e.g. gunicorn worker) that opens it
+###
+_MAGIC = b"MSCS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIQQII")
+_ENTRY = struct.Struct("<16sQI4x")
+
+def _key_digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+def write_card_store(path: str, cards: Iterable[dict]) -> int:
+    ###
+    # Streams cards into a new store file and atomically replaces any existing store at path
+    # Processes that already mapped the old file keep reading it until they reload()
+    ###
+    oracle_entries = []
+    name_entries = []
+    count = 0
+    temp_path = path + ".tmp"
+    packer = msgpack.Packer()
+    with open(temp_path, 'wb') as f:
+        f.write(b"\0" * _HEADER.size)
+        offset = _HEADER.size
+        for card in cards:
+            record = packer.pack(card)
+            f.write(record)
+            if card.get('scryfallOracleId'):
+                oracle_entries.append((_key_digest(card['scryfallOracleId']), offset, len(record)))
+            names = {card.get('name'), card.get('faceName')}
+            for name in names - {None}:
+                name_entries.append((_key_digest(name), offset, len(record)))
+            offset += len(record)
+            count += 1
+        oracle_index_offset = offset
+        for entry in sorted(oracle_entries):
+            f.write(_ENTRY.pack(*entry))
+        name_index_offset = oracle_index_offset + len(oracle_entries) * _ENTRY.size
+        for entry in sorted(name_entries):
+            f.write(_ENTRY.pack(*entry))
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _VERSION, count, oracle_index_offset, name_index_offset,
+            len(oracle_entries), len(name_entries)))
+    os.replace(temp_path, path)
+    return count
+
+class CardStore():
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._map = None
+        self.reload()
+
+    def __len__(self) -> int:
+        return self.count
+
+    ###
+    # Private methods
+    ###
+    def __entry_digest(self, index_offset: int, i: int) -> bytes:
+        start = index_offset + i * _ENTRY.size
+        return self._map[start:start + 16]
+
+    def __search(self, index_offset: int, entry_count: int, key: str) -> list:
+        # Binary search for the first entry with a matching digest, then collect every record sharing that digest
+        digest = _key_digest(key)
+        low, high = 0, entry_count
+        while low < high:
+            mid = (low + high) // 2
+            if self.__entry_digest(index_offset, mid) < digest:
+                low = mid + 1
+            else:
+                high = mid
+        cards = []
+        while low < entry_count and self.__entry_digest(index_offset, low) == digest:
+            _, offset, length = _ENTRY.unpack_from(self._map, index_offset + low * _ENTRY.size)
+            cards.append(msgpack.unpackb(self._map[offset:offset + length]))
+            low += 1
+        return cards
+
+    ###
+    # Utility Methods
+    ###
+    def reload(self) -> None:
+        # Maps the current file at self.path (e.g. after a local data update replaced it)
+        self.close()
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._oracle_index, self._name_index, self._oracle_count, self._name_count = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError("%s is not a version %s MetaSyn card store" % (self.path, _VERSION))
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def find_by_oracle_id(self, oracle_id: str) -> list:
+        # Every face of a multi-faced card shares the same scryfallOracleId
+        return [card for card in self.__search(self._oracle_index, self._oracle_count, oracle_id)
+            if card.get('scryfallOracleId') == oracle_id]
+
+    def find_by_name(self, name: str) -> list:
+        # Matches either a card's full name or the name of one of its faces
+        return [card for card in self.__search(self._name_index, self._name_count, name)
+            if name in (card.get('name'), card.get('faceName'))]
@@ -0,0 +1,61 @@
+# Streaming decompression of the compressed artifacts published by mtgjson (e.g. AtomicCards.json.xz)
+from typing import Iterable, Iterator
+from zipfile import ZipFile
+import bz2
+import lzma
+import tempfile
+import zlib
+
+# Size of the buffers read from (and written to) the decompression streams
+BUFFER_SIZE = 1 << 20
+
+def _iter_stream(decompressor, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    flush = getattr(decompressor, 'flush', None)
+    if flush is not None:
+        data = flush()
+        if data:
+            yield data
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # 16 + MAX_WBITS: expect a gzip header and trailer
+    yield from _iter_stream(zlib.decompressobj(16 + zlib.MAX_WBITS), chunks)
+
+def iter_xz(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    yield from _iter_stream(lzma.LZMADecompressor(), chunks)
+
+def iter_bz2(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    yield from _iter_stream(bz2.BZ2Decompressor(), chunks)
+
+def iter_zip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # A zip's member list is at the end of the archive, so the compressed bytes are spooled to a temp file first.
+    # The archive's first member is then decompressed in BUFFER_SIZE blocks
+    with tempfile.TemporaryFile() as archive:
+        for chunk in chunks:
+            archive.write(chunk)
+        archive.seek(0)
+        with ZipFile(archive) as zipped:
+            with zipped.open(zipped.namelist()[0]) as member:
+                block = member.read(BUFFER_SIZE)
+                while block:
+                    yield block
+                    block = member.read(BUFFER_SIZE)
+
+# File extension of the compressed artifact -> decompressing generator
+COMPRESSION_FORMATS = {
+    "gz": iter_gzip,
+    "xz": iter_xz,
+    "bz2": iter_bz2,
+    "zip": iter_zip
+}
+
+def iter_decompressed(chunks: Iterable[bytes], compression: str=None) -> Iterator[bytes]:
+    # Yields the decompressed bytes of a stream of compressed chunks (chunks pass through if compression is None)
+    if compression is None:
+        return iter(chunks)
+    if compression not in COMPRESSION_FORMATS:
+        raise KeyError("Unsupported compression format: %s (expected one of %s)" % (compression, list(COMPRESSION_FORMATS)))
+    return COMPRESSION_FORMATS[compression](chunks)
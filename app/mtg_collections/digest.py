@@ -0,0 +1,18 @@
+# Deterministic identifiers and content digests for card documents
+# Unlike Python's hash(), these are stable across processes, so local data can be diffed against MongoDB
+import hashlib
+import json
+
+# Fields that are derived from the card and must not be part of its content digest
+_DERIVED_FIELDS = ("_id", "_digest")
+
+def card_id(oracle_id: str, face_name: str=None) -> str:
+    # Each face of a multi-faced card shares the scryfallOracleId, so faceName keeps face ids unique
+    key = oracle_id if face_name is None else "%s|%s" % (oracle_id, face_name)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+def content_digest(card: dict) -> str:
+    # Digest of the normalized card fields (keys sorted, compact separators, derived fields removed)
+    normalized = {key: value for key, value in card.items() if key not in _DERIVED_FIELDS}
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
@@ -0,0 +1,104 @@
+# Shared, pooled HTTP client for the data sources (mtgjson, magicthegathering.io)
+# Every fetch goes through one requests.Session, so concurrent refreshes reuse kept-alive connections
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlsplit
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+# Responses that are worth retrying (rate limiting & temporary server errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+###
+# Wraps a requests.Session with connection pooling, default timeouts and retries with jittered backoff
+# At most max_per_host requests are sent to a host at the same time (a request waits up to host_wait seconds for
+# a slot). A slot is held until the response's headers arrive; streamed bodies are read outside of it, so callers
+# must read or close() every streamed response to hand its connection back to the pool
+###
+class HttpClient():
+    def __init__(self, max_per_host: int=4, max_hosts: int=10, timeout=DEFAULT_TIMEOUT, retries: int=3,
+            backoff: float=0.5, host_wait: float=60):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_per_host = max_per_host
+        self.host_wait = host_wait
+        self.__host_slots = {}
+        self.__host_slots_lock = Lock()
+        self.session = requests.Session()
+        # Non-blocking pools: a busy pool opens an extra connection instead of waiting for one forever
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    ###
+    # Private methods
+    ###
+    def __get_host_slots(self, url: str) -> BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self.__host_slots_lock:
+            if host not in self.__host_slots:
+                self.__host_slots[host] = BoundedSemaphore(self.max_per_host)
+            return self.__host_slots[host]
+
+    def __send(self, url: str, **kwargs) -> requests.Response:
+        slots = self.__get_host_slots(url)
+        if not slots.acquire(timeout=self.host_wait):
+            raise requests.ConnectionError("Timed out waiting for a free connection to %s" % urlsplit(url).netloc)
+        try:
+            return self.session.get(url, **kwargs)
+        finally:
+            slots.release()
+
+    def __sleep_before_retry(self, attempt: int, retry_after: str=None) -> None:
+        delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+
+    ###
+    # Utility Methods
+    ###
+    def get(self, url: str, **kwargs) -> requests.Response:
+        # Same arguments as requests.get. Connection errors, timeouts and RETRY_STATUSES are retried up to
+        # `retries` times; the last response (or error) is returned (or raised) as is
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                r = self.__send(url, **kwargs)
+            except RETRY_ERRORS as e:
+                if attempt > self.retries:
+                    raise
+                print("Request to %s failed (attempt %s): %s. Retrying..." % (url, attempt, e))
+                self.__sleep_before_retry(attempt)
+                continue
+            if r.status_code in RETRY_STATUSES and attempt <= self.retries:
+                print("Request to %s returned %s (attempt %s). Retrying..." % (url, r.status_code, attempt))
+                r.close()
+                self.__sleep_before_retry(attempt, r.headers.get('Retry-After'))
+                continue
+            return r
+
+    def close(self) -> None:
+        self.session.close()
+
+_client = None
+_client_lock = Lock()
+
+def get_client() -> HttpClient:
+    # Process-wide client, created on first use
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
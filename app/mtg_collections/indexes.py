@@ -0,0 +1,128 @@
+# Declarative MongoDB index specs, applied idempotently by the DB Manager, and an explain() report for route queries
+from typing import Dict, List
+
+from pymongo import ASCENDING
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+
+from app.projections import (CARD_PROFILE_PROJECTION, GATHER_CARDS_PROJECTION, KEYWORDS_PROJECTION, SETS_PROJECTION,
+    SUBTYPES_PROJECTION, TYPES_PROJECTION)
+
+###
+# Indexes per collection
+#   keys: list of (field, direction) pairs
+#   name: index name
+#   unique: (optional) defaults to False
+# get_index_specs() adds a unique index on each Updater's _identifier. Those also cover the sorted /api/sets,
+# /api/keywords and /api/types queries (which only project the identifier) and serve /api/subtypes' "type" filter
+# (subtypes is an array, so no index can cover that query)
+###
+INDEX_SPECS = {
+    "AllCards": [
+        # /api/gatherCards: equality on setCode, keyset pagination on _id
+        {"keys": [("setCode", ASCENDING), ("_id", ASCENDING)], "name": "setCode_id"},
+        # /api/synergize: selected card lookup (CardIndex)
+        {"keys": [("multiverseId", ASCENDING)], "name": "multiverseId"}
+    ]
+}
+
+###
+# Queries made by the API routes, checked by explain_queries(). The projections are the ones the routes use
+# (app/projections.py); filters and sorts must be kept in sync with routes.py
+###
+ROUTE_QUERIES = [
+    {"route": "/api/sets", "collection": "sets", "filter": {}, "projection": SETS_PROJECTION,
+        "sort": [("code", ASCENDING)]},
+    {"route": "/api/keywords", "collection": "keywords", "filter": {}, "projection": KEYWORDS_PROJECTION,
+        "sort": [("keyword", ASCENDING)]},
+    {"route": "/api/types", "collection": "types", "filter": {}, "projection": TYPES_PROJECTION,
+        "sort": [("type", ASCENDING)]},
+    {"route": "/api/subtypes", "collection": "types", "filter": {"type": "Creature"},
+        "projection": SUBTYPES_PROJECTION, "sort": [("subtypes", ASCENDING)]},
+    {"route": "/api/gatherCards", "collection": "AllCards", "filter": {"setCode": "M21"},
+        "projection": GATHER_CARDS_PROJECTION, "sort": [("_id", ASCENDING)]},
+    {"route": "/api/synergize", "collection": "AllCards", "filter": {"multiverseId": {"$in": ["1", 1]}},
+        "projection": CARD_PROFILE_PROJECTION},
+    {"route": "/api/synergize", "collection": "synergies", "filter": {"_id": "Llanowar Elves"}}
+]
+
+def get_index_specs(updaters: dict) -> Dict[str, List[dict]]:
+    # INDEX_SPECS plus a unique index on the _identifier of each Updater's collection (_id is always unique)
+    specs = {collection: list(indexes) for collection, indexes in INDEX_SPECS.items()}
+    for updater in updaters.values():
+        if updater._identifier in (None, "_id"):
+            continue
+        specs.setdefault(updater.get_collection_name(), []).insert(0,
+            {"keys": [(updater._identifier, ASCENDING)], "name": updater._identifier + "_unique", "unique": True})
+    return specs
+
+def _get_key(keys) -> list:
+    # Normalizes index keys for comparison (the server may return directions as floats, e.g. 1.0)
+    return [(field, direction if isinstance(direction, str) else int(direction)) for field, direction in keys]
+
+def ensure_indexes(db: Database, specs: Dict[str, List[dict]]) -> Dict[str, dict]:
+    # Creates the indexes in `specs` that don't exist yet. An existing index with the same keys and uniqueness is
+    # left alone (whatever its name). An existing index with the same name but different keys or options is reported
+    # as a conflict rather than dropped
+    report = {}
+    for collection_name, indexes in specs.items():
+        collection = db[collection_name]
+        results = report[collection_name] = {"created": [], "existing": [], "conflicts": [], "errors": []}
+        existing = collection.index_information()
+        for spec in indexes:
+            key = _get_key(spec["keys"])
+            unique = spec.get("unique", False)
+            same = [name for name, info in existing.items()
+                if _get_key(info["key"]) == key and info.get("unique", False) == unique]
+            if same:
+                results["existing"].append(same[0])
+                continue
+            if spec["name"] in existing:
+                results["conflicts"].append(spec["name"])
+                continue
+            try:
+                collection.create_index(key, name=spec["name"], unique=unique)
+                results["created"].append(spec["name"])
+            except OperationFailure as e:
+                # e.g. duplicate keys prevent a unique index
+                results["errors"].append("%s: %s" % (spec["name"], e))
+    return report
+
+def print_index_report(report: Dict[str, dict]) -> None:
+    print("\n-- Indexes --")
+    for collection_name, results in report.items():
+        print("%s: %s" % (collection_name, ", ".join("%s: %s" % (key, value) for key, value in results.items() if value)
+            or "no indexes"))
+
+def get_plan_stages(plan: dict) -> List[str]:
+    # Flattens a queryPlanner plan tree into its stage names (parent stages first)
+    stages = [plan.get("stage")]
+    for child in ([plan["inputStage"]] if "inputStage" in plan else []) + plan.get("inputStages", []):
+        stages += get_plan_stages(child)
+    return stages
+
+def explain_queries(db: Database, queries: List[dict]=ROUTE_QUERIES) -> List[dict]:
+    # Runs explain() for each route query and flags the ones that aren't index-backed (COLLSCAN) or sort in memory
+    results = []
+    for query in queries:
+        cursor = db[query["collection"]].find(query["filter"], query.get("projection"))
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        stages = get_plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        results.append({"route": query["route"], "collection": query["collection"], "stages": stages,
+            "index_backed": "COLLSCAN" not in stages, "in_memory_sort": "SORT" in stages,
+            "covered": "IXSCAN" in stages and "FETCH" not in stages})
+    return results
+
+def print_explain_report(results: List[dict]) -> None:
+    print("\n-- Route Query Plans --")
+    for result in results:
+        flags = []
+        if not result["index_backed"]:
+            flags.append("NOT INDEX-BACKED")
+        if result["in_memory_sort"]:
+            flags.append("IN-MEMORY SORT")
+        if result["covered"]:
+            flags.append("covered")
+        print("%-18s %-10s %-40s %s" % (result["route"], result["collection"], " <- ".join(result["stages"]),
+            ", ".join(flags)))
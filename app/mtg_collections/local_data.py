@@ -1,24 +1,50 @@
 from abc import ABC
 from itertools import chain
-from zipfile import ZipFile
+from threading import Lock
+from typing import Iterator
 import requests
+import hashlib
 import json
-import chunk
+import os
+
+import ijson
+
+from app.mtg_collections.card_store import CardStore, write_card_store
+from app.mtg_collections.compression import BUFFER_SIZE, iter_decompressed
+from app.mtg_collections import http_client
+from app.mtg_collections.digest import card_id, content_digest
+from app.mtg_collections.storage import IStorage, get_storage
 
 ###
 # Abstract class for local data interfaces
 ###
 class ILocalData(ABC):
     _data_dir_path = './app/data/'
+    _meta_file_name = "Meta.json"
+    # Number of times an interrupted download is resumed before giving up
+    _download_retries = 3
+    # Bytes read from the network at a time. A read that is cut off is lost, so this is smaller than BUFFER_SIZE
+    _download_chunk_size = 1 << 16
+    # Reject downloads whose published checksum ({artifact}.sha256) can't be retrieved. If False they are saved
+    # unverified (with a warning)
+    _require_checksum = True
+    # Process-level cache of parsed local data: {path: ((mtime_ns, size), data)}
+    _data_cache = {}
+    _data_cache_lock = Lock()
 
-    def __init__(self, data_category, file_name, data_endpoint):
+    def __init__(self, data_category, file_name, data_endpoint, storage_format="json", compression=None):
         self.category = data_category
+        # On-disk format of the formatted local data (see storage.STORAGE_FORMATS)
+        self.storage = get_storage(storage_format)
         # Local data file "Getters"
         self.file_name = file_name
         self.get_date = self.__get_local_data_date
         self.get_data = self.__get_local_data
+        self.iter_data = self.__iter_local_data
         # API Data for updates
         self.endpoint = data_endpoint
+        # Extension of the compressed artifact to download instead of the plain JSON (see compression.COMPRESSION_FORMATS)
+        self.compression = compression
         
     ###
     # Private methods
@@ -28,17 +54,39 @@ class ILocalData(ABC):
 
     # Methods for main local file used for storing and reformatting data before updating Mongo DB
     def __get_file_path(self) -> str:
-        return self._data_dir_path + self.file_name
+        return self._data_dir_path + os.path.splitext(self.file_name)[0] + self.storage.extension
 
     def __get_local_data_date(self) -> str:
         print(self.__get_file_path())
-        date = self.__get_date_from_file(self.__get_file_path())
+        date = self.__get_date_from_file(self.__get_file_path(), self.storage)
         return date
 
     def __get_local_data(self) -> dict:
+        # Parsed data is shared by every caller in the process until the file's mtime or size changes,
+        # so callers must treat it as read-only
+        path = self.__get_file_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(path + " not found")
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        with self._data_cache_lock:
+            cached = self._data_cache.get(path)
+            if cached is not None and cached[0] == file_key:
+                return cached[1]
+        data = self.__get_all_data_from_file(path)
+        with self._data_cache_lock:
+            self._data_cache[path] = (file_key, data)
+        return data
+
+    def invalidate(self) -> None:
+        with self._data_cache_lock:
+            self._data_cache.pop(self.__get_file_path(), None)
+
+    def __iter_local_data(self) -> Iterator:
+        # Yields one formatted item (card, set, type or keyword) at a time without loading the whole file
         try:
-            data = self.__get_all_data_from_file(self.__get_file_path())
-            return data[self.category]
+            yield from self.storage.iter_items(self.__get_file_path(), self.category)
         except FileNotFoundError:
             raise FileNotFoundError(self.__get_file_path() + " not found")
 
@@ -51,56 +99,112 @@ class ILocalData(ABC):
 
     def __get_temp_data_date(self) -> str:
         try:
-            date = self.__get_date_from_file(self.__get_temp_data_file_path())
+            # The downloaded file is only ever replaced whole (see __save_data_locally), so its header can be trusted
+            date = self.__get_date_from_file(self.__get_temp_data_file_path(), get_storage("json"), require_manifest=False)
             return date
         except FileNotFoundError:
             raise FileNotFoundError(self.__get_temp_data_file_path() + " not found")
 
-    def __get_temp_data(self) -> dict:
+    def __iter_temp_data(self) -> Iterator:
+        # Streams the raw API data one top-level entry at a time:
+        #   SetList 'data' is a list, so each set is yielded
+        #   AtomicCards, CardTypes & Keywords 'data' are objects, so each (key, value) pair is yielded
         try:
-            with open(self.__get_temp_data_file_path(), 'r') as f:
-                data = json.loads(f.read())
-            return data['data']
+            with open(self.__get_temp_data_file_path(), 'rb') as f:
+                if self.category == "sets":
+                    yield from ijson.items(f, 'data.item', use_float=True)
+                else:
+                    yield from ijson.kvitems(f, 'data', use_float=True)
         except FileNotFoundError:
             raise FileNotFoundError(self.__get_temp_data_file_path() + " not found")
         
+    # Sidecar manifest ({file}.manifest) written alongside each data file with its date, checksum, size & mtime
+    def __get_manifest_path(self, path: str) -> str:
+        return path + ".manifest"
+
+    def __write_manifest(self, path: str, date: str, checksum: str, **extra) -> None:
+        # extra holds optional fields, e.g. the HTTP validators (etag, last_modified) of downloaded data
+        stat = os.stat(path)
+        manifest = {"date": date, "sha256": checksum, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        manifest.update({key: value for key, value in extra.items() if value is not None})
+        with open(self.__get_manifest_path(path), 'w') as f:
+            f.write(json.dumps(manifest))
+
+    def __read_manifest(self, path: str) -> dict:
+        # Returns None if there is no manifest or the data file has changed since the manifest was written
+        try:
+            stat = os.stat(path)
+            with open(self.__get_manifest_path(path), 'r') as f:
+                manifest = json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        if manifest.get('size') != stat.st_size or manifest.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+        return manifest
+
+    def get_checksum(self) -> str:
+        manifest = self.__read_manifest(self.__get_file_path())
+        if manifest is None:
+            return None
+        return manifest['sha256']
+
+    def verify(self) -> bool:
+        # True if the local data file is complete, i.e. its content matches the checksum in its manifest
+        # (the manifest is only written once the data file has been written in full)
+        checksum = self.get_checksum()
+        if checksum is None:
+            return False
+        actual = hashlib.sha256()
+        with open(self.__get_file_path(), 'rb') as f:
+            for block in iter(lambda: f.read(BUFFER_SIZE), b""):
+                actual.update(block)
+        return actual.hexdigest() == checksum
+
     # Generic methods for getting date or data from a given file
-    def __get_date_from_file(self, path: str) -> str:
+    def __get_date_from_file(self, path: str, storage: IStorage, require_manifest: bool=True) -> str:
+        # The manifest is written once the data file is complete, so a data file without a (matching) manifest may
+        # be partial and counts as outdated. If not require_manifest, the date is read from the file's header instead
         date = None
         try:
-            with open(path, 'r') as f: 
-                data = json.loads(f.read())
-                date = data['meta']['date']
+            manifest = self.__read_manifest(path)
+            if manifest is not None:
+                return manifest['date']
+            os.stat(path)
+            if require_manifest:
+                print("Exception: " + path + " has no manifest or changed since it was written. New data needed.")
+                return ValueError(path + " has no valid manifest")
+            # Only the file's header is read
+            date = storage.read_meta(path)['date']
         except FileNotFoundError as e:
             print("Exception: " + path + " not found. New data needed.", e)
             return e
         except KeyError as e:
             print("Exception: " + path + " is missing date metadata. New data needed.", e)
             return e
-        except TypeError as e:
+        except (TypeError, ValueError, ijson.JSONError) as e:
             print("Exception: Unable to retrieve date from local data (%s).%s" % (e, path))
             return e
         return date
 
-    def __get_all_data_from_file(self, path: str) -> dict:
+    def __get_all_data_from_file(self, path: str) -> list:
         try:
-            with open(path, 'r') as f:
-                data_dict = json.loads(f.read())
-                return data_dict
+            return self.storage.load(path, self.category)
         except Exception as e:
             raise Exception("Error attempting to open data file:", e)
 
-    # Methods for formatting API data (as a dict that contains a list of dict items as one of the values) into needed structure based on category
+    # Methods for formatting streamed API data into needed structure based on category
     # Local Data should be returned in the following format: 
     #   {
     #       "meta": {
     #           "date": {date}
     #       }, {plural_category_name}: {formatted_data_}
     #   }
-    def __format_keywords_data(self, data: dict) -> dict:
+    # where {formatted_data_} may be a generator so that large categories can be written one item at a time
+    def __format_keywords_data(self, data: Iterator) -> dict:
         print("Formatting cached Keywords data")
-        flattened_iter = chain(data['abilityWords'], data['keywordAbilities'],
-                               data['keywordActions'])
+        keyword_lists = dict(data)
+        flattened_iter = chain(keyword_lists['abilityWords'], keyword_lists['keywordAbilities'],
+                               keyword_lists['keywordActions'])
         keywords = []
         for i in flattened_iter:
             keywords.append(i)
@@ -109,62 +213,56 @@ class ILocalData(ABC):
         reformatted_dict = { "meta" : { "date": self.__get_temp_data_date() }, "keywords": keywords}
         return reformatted_dict
 
-    def __format_sets_data(self, data: dict) -> dict:
+    def __format_sets_data(self, data: Iterator) -> dict:
         print("Formatting cached Sets data")
         sets = []
-        reformatted_dict = {"sets": []}
         for card_set in data:
             sets.append(card_set)
         sets.sort(key=lambda set: set['code'])
         reformatted_dict = { "meta" : { "date": self.__get_temp_data_date() }, "sets": sets}
         return reformatted_dict
 
-    def __format_cards_data(self, data: dict) -> dict:
+    def __format_card(self, card_name: str, card_version: dict) -> dict:
+        # Remove foreignData and printings from cardData to reduce size
+        card_version.pop('foreignData', None)
+        card_version.pop('printings', None)
+        try:
+            card_version['scryfallOracleId'] = card_version['identifiers']['scryfallOracleId']
+        except KeyError:
+            print(f"{card_name} has no scryfallOracleId. Skipping card...")
+            return None
+        del card_version['identifiers']
+        # Derive a stable "_id" from the card's scryfallOracleId + faceName (if available)
+        card_version['_id'] = card_id(card_version['scryfallOracleId'], card_version.get('faceName'))
+        # Digest of the card's content so later syncs only touch cards that changed
+        card_version['_digest'] = content_digest(card_version)
+        return card_version
+
+    def __iter_formatted_cards(self, data: Iterator) -> Iterator:
+        for card_name, card_versions in data:
+            for card_version in card_versions:
+                card = self.__format_card(card_name, card_version)
+                if card is not None:
+                    yield card
+
+    def __format_cards_data(self, data: Iterator) -> dict:
         print("Formatting cached Cards data")
         # AtomicCards data contains objects where:
         # KEY is a card name (key=<card_name>)
         # VALUE is an array of objects representing versions of cards with that name
-        # Reformat into a list of card objects and create AtomicCards.json file
-        cards = []
-        for card_name in data:
-            for card_version in data[card_name]:
-                # Remove foreignData and printings from cardData to reduce size
-                try:
-                    del card_version['foreignData']
-                except Exception as e:
-                    # No 'foreignData' available
-                    continue
-                try:
-                    del card_version['printings']
-                except Exception as f:
-                    # No 'printings' data available
-                    continue
-                # Create a hash of card's scryfallOracleId + faceName (if available) to create a unique "_id" value
-                try:
-                    card_version['_id'] = hash((card_version['identifiers']['scryfallOracleId'],
-                            card_version['faceName']))
-                except:
-                    try:
-                        card_version['scryfallOracleId'] = card_version['identifiers']['scryfallOracleId']
-                        del card_version['identifiers']
-                        card_version['_id'] = hash(card_version['scryfallOracleId'])
-                        # cards[str(card_version['identifiers']['scryfallOracleId'])] = card_version
-                        cards.append(card_version)
-                    except:
-                        print(f"{card_name} has no scryfallOracleId. Skipping card...")
-                        continue
-        reformatted_dict = { "meta" : { "date": self.__get_temp_data_date() }, "cards": cards}
+        # Reformat into a stream of card objects that is written to the AtomicCards.json file as it is read
+        reformatted_dict = { "meta" : { "date": self.__get_temp_data_date() }, "cards": self.__iter_formatted_cards(data)}
         return reformatted_dict
 
-    def __format_types_data(self, data: dict) -> dict:
+    def __format_types_data(self, data: Iterator) -> dict:
         print("Formatting cached Types data")
         types = []
-        for type in data:
-            types.append({"type": type, "subTypes": data[type]['subTypes'], "superTypes": data[type]['superTypes']})
+        for type, type_data in data:
+            types.append({"type": type, "subTypes": type_data['subTypes'], "superTypes": type_data['superTypes']})
         reformatted_dict = { "meta" : { "date": self.__get_temp_data_date() }, "types": types}
         return reformatted_dict
 
-    def __format_data(self, data: dict) -> dict:
+    def __format_data(self, data: Iterator) -> dict:
         switch = {
             "keywords": self.__format_keywords_data,
             "types": self.__format_types_data,
@@ -175,72 +273,263 @@ class ILocalData(ABC):
             formatted_data = switch.get(self.category)
             return formatted_data(data)
         except Exception as e:
-            Exception("Unable to format data:", e)
+            raise Exception("Unable to format data:", e)
+
+    def __write_formatted_data(self, formatted_data: dict) -> None:
+        # Items are written one at a time so the data never has to be held in memory as a single string
+        # The storage only replaces the local data file once every item has been written, so an error partway
+        # through leaves the previous data in place
+        # A checksum is computed while writing and stored in the file's manifest along with meta.date
+        checksum = self.storage.write(self.__get_file_path(), formatted_data['meta'], self.category,
+            formatted_data[self.category])
+        self.__write_manifest(self.__get_file_path(), formatted_data['meta']['date'], checksum)
+
+    # Memory-mapped card store (cards only) for O(log n) lookups of single cards by scryfallOracleId or name
+    def __get_card_store_path(self) -> str:
+        return self._data_dir_path + os.path.splitext(self.file_name)[0] + ".cardstore"
+
+    def __write_card_store(self) -> None:
+        print("Writing card store to", self.__get_card_store_path())
+        count = write_card_store(self.__get_card_store_path(), self.iter_data())
+        print("Stored %s cards" % count)
+
+    def get_card_store(self) -> CardStore:
+        try:
+            return CardStore(self.__get_card_store_path())
+        except FileNotFoundError:
+            raise FileNotFoundError(self.__get_card_store_path() + " not found")
+
+    def export_json(self) -> str:
+        # Writes a JSON copy of the local data (e.g. for debugging a binary storage format)
+        path = self._data_dir_path + os.path.splitext(self.file_name)[0] + ".export.json"
+        print("Exporting %s data to %s" % (self.category, path))
+        date = self.get_date()
+        if isinstance(date, Exception):
+            raise Exception("Unable to export %s data:" % self.category, date)
+        get_storage("json").write(path, {"date": date}, self.category, self.iter_data())
+        return path
 
     def __get_item_from_local_data(self, key, item_id: str) -> dict:
         local_data = self.get_data()
         item_dict = local_data[key][item_id]
         return item_dict 
 
+    # mtgjson publishes a small Meta.json (build date & version) next to each dataset file
+    def __get_meta_endpoint(self) -> str:
+        return self.endpoint.rsplit("/", 1)[0] + "/" + self._meta_file_name
+
+    def __fetch_latest_meta_date(self) -> str:
+        # Returns None if the meta endpoint can't be reached, in which case the conditional download decides
+        try:
+            with http_client.get(self.__get_meta_endpoint()) as r:
+                r.raise_for_status()
+                return r.json()['meta']['date']
+        except Exception as e:
+            print("Unable to retrieve latest date from %s: %s" % (self.__get_meta_endpoint(), e))
+            return None
+
+    def __get_conditional_headers(self) -> dict:
+        # Validators saved from the response that produced the current temp data file
+        headers = {}
+        manifest = self.__read_manifest(self.__get_temp_data_file_path())
+        if manifest is None:
+            return headers
+        if manifest.get('etag'):
+            headers['If-None-Match'] = manifest['etag']
+        if manifest.get('last_modified'):
+            headers['If-Modified-Since'] = manifest['last_modified']
+        return headers
+
+    def __get_download_url(self) -> str:
+        # mtgjson publishes each file compressed as {file}.gz, .xz, .bz2 & .zip
+        if self.compression is None:
+            return self.endpoint
+        return self.endpoint + "." + self.compression
+
+    # The raw (possibly compressed) artifact is downloaded to {temp file}.{compression}.part, so an interrupted
+    # download can be resumed with a Range request
+    def __get_part_file_path(self) -> str:
+        return self._data_dir_path + "new" + self.__get_download_url().split("/").pop() + ".part"
+
+    def __remove_part_file(self) -> None:
+        for path in (self.__get_part_file_path(), self.__get_manifest_path(self.__get_part_file_path())):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __read_part_validators(self) -> dict:
+        # ETag/Last-Modified of the response that started the partial download
+        try:
+            with open(self.__get_manifest_path(self.__get_part_file_path()), 'r') as f:
+                return json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def __get_resume_headers(self, offset: int) -> dict:
+        # If-Range makes the server send the whole (new) file instead of the rest of the old one if it changed
+        validators = self.__read_part_validators()
+        validator = validators.get('etag') or validators.get('last_modified')
+        if validator is None:
+            return None
+        return {"Range": "bytes=%s-" % offset, "If-Range": validator}
+
     # GET data from API, reformat (if needed), and store in temp data file (w/ "new" prefix) 
-    def __fetch_latest_api_data(self) -> requests.Request:
-        print('Requesting =>', self.endpoint)
+    def __fetch_latest_api_data(self, headers: dict=None) -> requests.Response:
+        # Returns the streamed response (status 200, 206, 304 or 416), or None if the request failed
+        print('Requesting =>', self.__get_download_url(), headers or "")
         try:
-            if self.__get_temp_data_file_path().split(".").pop() == "zip":
-                r = requests.get(self.endpoint, headers={"Content-Type": "application/zip"})
-            else: 
-                r = requests.get(self.endpoint, stream=True)
-            if r.status_code == 200:
+            r = http_client.get(self.__get_download_url(), headers=headers, stream=True)
+            if r.status_code in (200, 206, 304, 416):
                 return r
             else:
+                # Hand the streamed connection back to the pool
+                r.close()
                 raise Exception("Failed to retrieve new API data. Response code is not '200':", r.status_code)
         except Exception as e:
             print(e)
 
-    def __save_data_locally(self, req_data: chunk, chunk_size=128) -> None:
+    def __save_part(self, r: requests.Response, offset: int) -> None:
+        # Appends a 206 response to the partial file, or starts it over for a 200 response
+        # Raises ConnectionError if the response ends before the expected number of bytes
+        part_path = self.__get_part_file_path()
+        if r.status_code == 416:
+            # The partial file already holds the whole artifact
+            r.close()
+            return
+        if r.status_code == 200:
+            offset = 0
+            with open(self.__get_manifest_path(part_path), 'w') as f:
+                f.write(json.dumps({"etag": r.headers.get('ETag'), "last_modified": r.headers.get('Last-Modified')}))
+        with open(part_path, 'ab' if offset else 'wb', buffering=BUFFER_SIZE) as f:
+            for data in r.iter_content(chunk_size=self._download_chunk_size):
+                f.write(data)
+        expected = r.headers.get('Content-Length')
+        received = os.path.getsize(part_path) - offset
+        if expected is not None and received < int(expected):
+            raise requests.ConnectionError("Received %s of %s bytes" % (received, expected))
+
+    def __fetch_published_checksum(self) -> str:
+        # mtgjson publishes the SHA256 of every artifact as {artifact}.sha256
+        try:
+            with http_client.get(self.__get_download_url() + ".sha256") as r:
+                r.raise_for_status()
+                return r.text.split()[0].lower()
+        except Exception as e:
+            print("Unable to retrieve published checksum for %s: %s" % (self.__get_download_url(), e))
+            return None
+
+    def __verify_part(self, published: str) -> bool:
+        checksum = hashlib.sha256()
+        with open(self.__get_part_file_path(), 'rb') as f:
+            for block in iter(lambda: f.read(BUFFER_SIZE), b""):
+                checksum.update(block)
+        if checksum.hexdigest() != published:
+            print("Checksum mismatch for %s. Expected: %s Actual: %s" % (self.__get_download_url(), published,
+                checksum.hexdigest()))
+            return False
+        return True
+
+    def __download_latest_api_data(self) -> bool:
+        # Conditional GET: the server answers 304 (no body) if the temp data file is still current.
+        # An interrupted transfer is resumed from the end of the partial file (up to _download_retries times)
+        # Returns True if new data was verified and saved
+        part_path = self.__get_part_file_path()
+        for attempt in range(self._download_retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = (offset and self.__get_resume_headers(offset)) or self.__get_conditional_headers()
+            r = self.__fetch_latest_api_data(headers)
+            if r is None:
+                # The client has already retried transient errors, so this failure is permanent (e.g. 404)
+                return False
+            if r.status_code == 304:
+                print("%s has not been modified. Skipping download." % self.__get_download_url())
+                r.close()
+                return False
+            if "Range" not in headers:
+                offset = 0
+            try:
+                self.__save_part(r, offset)
+                break
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                print("Download interrupted (attempt %s): %s. Resuming..." % (attempt + 1, e))
+            finally:
+                r.close()
+        else:
+            print("Unable to download %s after %s attempts" % (self.__get_download_url(), self._download_retries + 1))
+            return False
+        published = self.__fetch_published_checksum()
+        if published is None:
+            if self._require_checksum:
+                # The partial file is kept, so the next check only has to verify it
+                print("ERROR: No published checksum for %s. Download rejected." % self.__get_download_url())
+                return False
+            print("WARNING: No published checksum for %s. Saving it UNVERIFIED." % self.__get_download_url())
+        elif not self.__verify_part(published):
+            self.__remove_part_file()
+            return False
+        self.__save_data_locally(self.__read_part_validators())
+        return True
+
+    def __save_data_locally(self, validators: dict) -> None:
+        # Decompresses the verified artifact into a scratch file, then atomically replaces the temp data file
         print("Saving data to", str(self.__get_temp_data_file_path()))
+        temp_path = self.__get_temp_data_file_path()
+        scratch_path = temp_path + ".tmp"
         try:
-            # Handle .zip files, if applicable
-            if self.__get_temp_data_file_path().split(".").pop() == "zip":
-                print("Extracting zipped file(s)")
-                ZipFile.extractall(self.__get_temp_data_file_path())
-            with open(self.__get_temp_data_file_path(), 'wb') as f:
-                for chunk in req_data.iter_content(chunk_size=chunk_size):
-                    f.write(chunk)
+            checksum = hashlib.sha256()
+            with open(self.__get_part_file_path(), 'rb') as part, open(scratch_path, 'wb', buffering=BUFFER_SIZE) as f:
+                for data in iter_decompressed(iter(lambda: part.read(BUFFER_SIZE), b""), self.compression):
+                    checksum.update(data)
+                    f.write(data)
+            os.replace(scratch_path, temp_path)
+            self.__remove_part_file()
+            # Keep the response's validators so the next request can be conditional
+            self.__write_manifest(temp_path, get_storage("json").read_meta(temp_path)['date'], checksum.hexdigest(),
+                etag=validators.get('etag'), last_modified=validators.get('last_modified'))
         except Exception as e:
             print(e)
 
-    def __is_outdated(self) -> bool:
+    def is_outdated(self) -> bool:
+        # Checks Meta.json first, so nothing is downloaded when the local data already has the latest date.
+        # Otherwise downloads the latest API data (conditionally) and compares its date with the local data's date
         print("\nChecking for new '" + self.category + "' data...")
         last_updated = self.get_date()
-        if type(last_updated) == FileNotFoundError:
-            print("No local data saved. Fetching latest data for cache.")
-            latest = self.__fetch_latest_api_data()
-            self.__save_data_locally(latest)
-            return True
+        latest = self.__fetch_latest_meta_date()
+        if not isinstance(last_updated, Exception) and latest is not None and str(latest) <= str(last_updated):
+            print("No updates available. Last Updated: %s Latest: %s" % (last_updated, latest))
+            return False
         cached = self.__get_temp_data_date()
-        if type(cached) == FileNotFoundError:
-            print("No date from Cached Data. Pulling new latest API data.")
-            latest = self.__fetch_latest_api_data()
-            self.__save_data_locally(latest)
-            cached = self.__get_temp_data_date()
+        if isinstance(cached, Exception) or latest is None or str(cached) < str(latest):
+            print("Cached data is missing or outdated. Pulling latest API data.")
+            if self.__download_latest_api_data():
+                cached = self.__get_temp_data_date()
+        if isinstance(cached, Exception):
+            print("No cached data available for '%s'." % self.category)
+            return False
+        if isinstance(last_updated, Exception):
+            print("No local data saved. Using latest cached data.")
+            return True
         if str(last_updated) < str(cached):
             print("Cached data is newer than last update. Last Updated: %s Cached: %s" % (last_updated, cached))
             return True
         print("No updates available. Last Updated: %s Cached: %s" % (last_updated, cached))
         return False
 
+    def format_and_save(self) -> None:
+        # CPU-bound half of an update: format the downloaded API data and save it as the local data
+        print("Updating local data...")
+        # Format raw API data into needed structure
+        formatted_data = self.__format_data(self.__iter_temp_data())
+        try: # Save formatted data into local file for further use
+            self.__write_formatted_data(formatted_data)
+            if self.category == "cards":
+                self.__write_card_store()
+        except Exception as e:
+            raise Exception("Error while saving cached data to local file:", e)
+        finally:
+            self.invalidate()
+
     def update(self) -> None:
-        if self.__is_outdated():
-            print("Updating local data...")
-            # Format raw API data into needed structure
-            formatted_data = self.__format_data(self.__get_temp_data())
-            try: # Save formatted data into local file for further use
-                with open(self.__get_file_path(), 'w') as f:
-                    f.write(json.dumps(formatted_data, indent=4))
-            except Exception as e:
-                Exception("Error while saving cached data to local file:", e)
-            # 4) Pass new data to DB Manager
-            # 5) Replace local data with temp data 
-            pass
-        
\ No newline at end of file
+        if self.is_outdated():
+            self.format_and_save()
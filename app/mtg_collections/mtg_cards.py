@@ -1,13 +1,23 @@
-import requests
+from datetime import datetime
 import json
 import os
 
+from pymongo import DeleteOne, ReplaceOne
+
+from app.mtg_collections import http_client
+from app.mtg_collections.digest import card_id, content_digest
 from app.mtg_collections.update import IUpdater
 
 class CardsUpdater(IUpdater):
     _capitalized_name = "Cards"
     _data_endpoint = "https://mtgjson.com/api/v5/AtomicCards.json"
-    _identifier = "scryfallOracleId"
+    # Faces of a multi-faced card share a scryfallOracleId, so cards are keyed by their derived _id
+    _identifier = "_id"
+    _storage_format = "msgpack"
+    # AtomicCards.json is ~10x smaller as .xz
+    _data_compression = "xz"
+    # A sync that would delete more than this share of the DB Collection is refused
+    _max_delete_share = 0.25
     new_items = []
     new_attributes = []
 
@@ -15,23 +25,66 @@ class CardsUpdater(IUpdater):
         return self.__is_local_update_needed(self.last_updated())
 
     def get_distinct_coll_items(self) -> list:
-        return self.get_whole_collection().distinct("identifiers")
+        return self.get_whole_collection().distinct(self._identifier)
 
-    def get_items_to_add(self) -> list:
+    def __get_coll_digests(self) -> dict:
+        # {_id: _digest} for every card in the DB Collection (documents synced before digests existed map to None)
+        return {card['_id']: card.get('_digest') for card in self.collection.find({}, {'_id': 1, '_digest': 1})}
+
+    def __diff_local_data(self) -> None:
+        # Compares local card digests with the digests stored in the DB Collection
+        #   new_items: cards whose _id is not in the DB
+        #   new_attributes: cards whose content digest changed
+        #   stale_items: _ids in the DB that are no longer in the local data
+        print("Comparing local %s with DB..." % self._capitalized_name)
+        start = datetime.now()
+        coll_digests = self.__get_coll_digests()
         self.new_items = []
-        local_data = self.local.get_data()
-        coll_items = self.get_distinct_coll_items()
-        for cached_item in local_data:
-            print(cached_item)
-            if cached_item not in coll_items:
-                self.new_items.append({ self._identifier: cached_item })
+        self.new_attributes = []
+        for card in self.local.iter_data():
+            if card['_id'] not in coll_digests:
+                self.new_items.append(card)
+            elif coll_digests.pop(card['_id']) != card['_digest']:
+                self.new_attributes.append(card)
+        self.stale_items = list(coll_digests)
+        print("Total Time to compare %s: %s" % (self._capitalized_name, datetime.now() - start))
+
+    def get_items_to_add(self) -> list:
+        self.__diff_local_data()
         return self.new_items
 
     def get_items_to_update(self) -> list:
-        self.new_attributes = []
-        print("TODO: implement card attributes updater")
+        self.__diff_local_data()
         return self.new_attributes
 
+    def sync(self) -> dict:
+        ###
+        # Incremental sync: unordered bulk writes of upserts for new/changed cards and deletes for stale cards
+        # Every card in the DB that is missing from the local data gets deleted, so the local data must be complete
+        ###
+        print("\n-- Syncing %s --" % self._capitalized_name)
+        if not self.local.verify():
+            raise Exception("Local %s data does not match its manifest (incomplete or not formatted). Sync aborted."
+                % self._capitalized_name)
+        coll_count = self.collection.count_documents({})
+        self.__diff_local_data()
+        print("New: %s Changed: %s Removed: %s" % (len(self.new_items), len(self.new_attributes), len(self.stale_items)))
+        if len(self.stale_items) > coll_count * self._max_delete_share:
+            raise Exception("Sync would delete %s of %s %s from the DB. Sync aborted." % (len(self.stale_items),
+                coll_count, self._capitalized_name))
+        operations = [ReplaceOne({'_id': card['_id']}, card, upsert=True) for card in self.new_items + self.new_attributes]
+        operations += [DeleteOne({'_id': card_id}) for card_id in self.stale_items]
+        report = {"inserted": 0, "modified": 0, "deleted": 0, "errors": []}
+        if not operations:
+            print("%s collection is up-to-date" % self._capitalized_name)
+            return report
+        bulk_report = self.bulk_write(operations)
+        totals = bulk_report.get_totals()
+        report = {"inserted": totals["upserted"], "modified": totals["modified"], "deleted": totals["deleted"],
+                  "errors": bulk_report.get_errors()}
+        print("Synced %s: %s" % (self._capitalized_name, report))
+        return report
+
     # TODO: create function to retrieve and update AllCards collection in DB
     def handle_cards_update(self):
         print("--- Cards ---")
@@ -39,7 +92,7 @@ class CardsUpdater(IUpdater):
         if self.local.__is_outdated():
             # Get latest sets from newAtomicCards.json
             # TODO: Use 'newAtomicCards.json' that has already been featched rather than requesting again
-            new_data = requests.get(
+            new_data = http_client.get(
                 self._data_endpoint).json()
             last_data_update = new_data['meta']['date']
             cards = {"cards": []}
@@ -49,14 +102,9 @@ class CardsUpdater(IUpdater):
             # Build a list of card versions and create AtomicCards.json file
             for card_name in new_data['data']:
                 for card_version in new_data['data'][card_name]:
-                    # Create a hash of card's faceName + scryfallOracleId to create a unique "_id" value
-                    try:
-                        card_version['_id'] = hash(
-                            (card_version['identifiers']['scryfallOracleId'],
-                             card_version['faceName']))
-                    except:
-                        card_version['_id'] = hash(
-                            card_version['identifiers']['scryfallOracleId'])
+                    # Derive a stable "_id" from the card's scryfallOracleId + faceName (if available)
+                    card_version['_id'] = card_id(card_version['identifiers']['scryfallOracleId'],
+                        card_version.get('faceName'))
                     # Remove foreignData and printings from cardData to reduce size
                     try:
                         del card_version['foreignData']
@@ -66,6 +114,7 @@ class CardsUpdater(IUpdater):
                         del card_version['printings']
                     except Exception as e:
                         print("Exception:", e)
+                    card_version['_digest'] = content_digest(card_version)
                     card = {str(card_version['identifiers']['scryfallOracleId']): card_version }
                     cards['cards'].append(card)
             cards_data = {"meta": {"date": last_data_update}, "cards": cards}
@@ -73,7 +122,7 @@ class CardsUpdater(IUpdater):
                 f.write(json.dumps(cards_data, indent=4))
             # Compare most recent list of cards with DB Collection
             collection = self.get_db_collection('cards')
-            # TODO: add function to run synergy calculator on new cards BEFORE they're inserted into database
+            # Synergy partners for new cards are precomputed by Manager.build_synergy_index() after sync
             # Get a list of dicts{'scryfallOracleId': <id>} that are not already in the DB Collection
             new_oracle_ids = self.get_items_to_add(self, collection, cards,
                                                'cards')
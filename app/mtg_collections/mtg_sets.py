@@ -17,16 +17,6 @@ class SetsUpdater(IUpdater):
     def get_distinct_coll_items(self) -> list:
         return self.get_whole_collection().distinct(self._identifier)
 
-    def get_items_to_add(self) -> list:
-        self.new_items = []
-        local_data = self.local.get_data()
-        coll_items = self.get_distinct_coll_items()
-        for set in local_data:
-            print(set[self._identifier])
-            if set not in coll_items:
-                self.new_items.append({ "set": set })
-        return self.new_items
-
     def get_items_to_update(self) -> list:
         self.new_attributes = []
         print("Only set codes are checked, so no additional data to update.")
@@ -0,0 +1,94 @@
+# Runs the Updaters concurrently, overlapping the download, format and DB sync phases of each collection
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Event
+from typing import Dict
+import os
+import time
+
+from app.mtg_collections.local_data import ILocalData
+from app.mtg_collections.update import IUpdater
+
+PHASES = ("download", "format", "sync")
+
+def format_local_data(category: str, file_name: str, endpoint: str, storage_format: str, data_dir_path: str) -> None:
+    # Runs in a worker process, so it rebuilds the ILocalData instead of pickling the Updater (and its DB client)
+    ILocalData._data_dir_path = data_dir_path
+    ILocalData(category, file_name, endpoint, storage_format).format_and_save()
+
+def start_worker() -> None:
+    # No-op, submitted to start the process pool's workers
+    pass
+
+###
+# Each collection runs as its own pipeline: download (I/O thread) -> format (process pool) -> DB sync (I/O thread)
+# Pipelines run concurrently, so a full refresh takes about as long as the slowest collection
+###
+class UpdateScheduler():
+    # A collection's DB sync waits until the syncs it depends on have finished
+    _sync_dependencies = {
+        "cards": ("sets",)
+    }
+
+    def __init__(self, updaters: Dict[str, IUpdater], cpu_workers: int=None):
+        self.updaters = updaters
+        self.cpu_workers = cpu_workers or min(len(updaters), os.cpu_count() or 1)
+        self.timings = {}
+        self.errors = {}
+
+    ###
+    # Private methods
+    ###
+    def __time_phase(self, name: str, phase: str, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.timings[name][phase] = time.perf_counter() - start
+
+    def __run_pipeline(self, name: str, cpu_pool: ProcessPoolExecutor, synced: Dict[str, Event]) -> None:
+        updater = self.updaters[name]
+        local = updater.local
+        try:
+            outdated = self.__time_phase(name, "download", local.is_outdated)
+            if outdated:
+                self.__time_phase(name, "format", lambda: cpu_pool.submit(format_local_data, local.category,
+                    local.file_name, local.endpoint, updater._storage_format, local._data_dir_path).result())
+            for dependency in self._sync_dependencies.get(name, ()):
+                if dependency in synced:
+                    synced[dependency].wait()
+            self.__time_phase(name, "sync", updater.sync)
+        except Exception as e:
+            self.errors[name] = e
+            print("Error while updating %s: %s" % (name, e))
+        finally:
+            synced[name].set()
+
+    ###
+    # Utility Methods
+    ###
+    def run(self) -> dict:
+        self.timings = {name: {} for name in self.updaters}
+        self.errors = {}
+        synced = {name: Event() for name in self.updaters}
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.cpu_workers) as cpu_pool:
+            # Fork the workers before the I/O threads start. A worker forked later could inherit a lock held by one
+            # of those threads (e.g. ILocalData._data_cache_lock) and deadlock on it
+            cpu_pool.submit(start_worker).result()
+            # One thread per pipeline, so a pipeline waiting on a dependency never blocks the one it waits for
+            with ThreadPoolExecutor(max_workers=len(self.updaters)) as io_pool:
+                pipelines = [io_pool.submit(self.__run_pipeline, name, cpu_pool, synced) for name in self.updaters]
+                for pipeline in pipelines:
+                    pipeline.result()
+        self.total_time = time.perf_counter() - start
+        self.print_summary()
+        return self.timings
+
+    def print_summary(self) -> None:
+        print("\n-- Update Summary (seconds) --")
+        print("%-10s" % "" + "".join("%10s" % phase for phase in PHASES) + "%10s" % "total")
+        for name, timings in self.timings.items():
+            row = "".join("%10.2f" % timings[phase] if phase in timings else "%10s" % "-" for phase in PHASES)
+            status = "  ERROR: %s" % self.errors[name] if name in self.errors else ""
+            print("%-10s" % name + row + "%10.2f" % sum(timings.values()) + status)
+        print("Total Time (wall clock): %.2f" % self.total_time)
@@ -0,0 +1,144 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+import hashlib
+import json
+import os
+import struct
+
+import ijson
+import msgpack
+
+###
+# Abstract class for on-disk formats of formatted local data
+# Every format stores a "meta" header (with meta.date) followed by the category's items
+###
+class IStorage(ABC):
+    extension = None
+
+    @abstractmethod
+    def write_file(self, f, meta: dict, category: str, items: Iterable) -> str:
+        # Writes meta + items to the binary file f and returns the SHA-256 of the written bytes
+        pass
+
+    def write(self, path: str, meta: dict, category: str, items: Iterable) -> str:
+        # Writes meta + items to a scratch file in the same directory, which only replaces path once every item has
+        # been written. Returns the SHA-256 of the written file
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                checksum = self.write_file(f, meta, category, items)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return checksum
+
+    @abstractmethod
+    def read_meta(self, path: str) -> dict:
+        pass
+
+    @abstractmethod
+    def iter_items(self, path: str, category: str) -> Iterator:
+        pass
+
+    def load(self, path: str, category: str) -> list:
+        return list(self.iter_items(path, category))
+
+###
+# JSON text: {"meta": {...}, "<category>": [<one item per line>]}
+###
+class JsonStorage(IStorage):
+    extension = ".json"
+
+    def write_file(self, f, meta: dict, category: str, items: Iterable) -> str:
+        checksum = hashlib.sha256()
+        def write(text):
+            encoded = text.encode('utf-8')
+            checksum.update(encoded)
+            f.write(encoded)
+        write('{"meta": %s, "%s": [' % (json.dumps(meta), category))
+        for i, item in enumerate(items):
+            write(",\n" if i else "\n")
+            write(json.dumps(item))
+        write("\n]}\n")
+        return checksum.hexdigest()
+
+    def read_meta(self, path: str) -> dict:
+        # "meta" comes before the data in mtgjson files (and in files written above), so only the prefix is parsed
+        with open(path, 'rb') as f:
+            for meta in ijson.items(f, 'meta'):
+                return meta
+        raise KeyError('meta')
+
+    def iter_items(self, path: str, category: str) -> Iterator:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, category + '.item', use_float=True)
+
+    def load(self, path: str, category: str) -> list:
+        # A full load is faster with the stdlib parser than with the incremental one
+        with open(path, 'r') as f:
+            return json.loads(f.read())[category]
+
+###
+# Length-prefixed msgpack records:
+#   b"MSDB" | uint32 header length | msgpack {"meta": {...}, "category": str} | (uint32 length | msgpack item)*
+###
+class MsgpackStorage(IStorage):
+    extension = ".msgpack"
+    _magic = b"MSDB"
+    _length = struct.Struct("<I")
+
+    def write_file(self, f, meta: dict, category: str, items: Iterable) -> str:
+        checksum = hashlib.sha256()
+        packer = msgpack.Packer()
+        def write_record(obj):
+            packed = packer.pack(obj)
+            record = self._length.pack(len(packed)) + packed
+            checksum.update(record)
+            f.write(record)
+        checksum.update(self._magic)
+        f.write(self._magic)
+        write_record({"meta": meta, "category": category})
+        for item in items:
+            write_record(item)
+        return checksum.hexdigest()
+
+    def __read_record(self, f) -> bytes:
+        prefix = f.read(self._length.size)
+        if not prefix:
+            return None
+        if len(prefix) < self._length.size:
+            raise ValueError("Truncated record length in %s" % f.name)
+        (length,) = self._length.unpack(prefix)
+        record = f.read(length)
+        if len(record) < length:
+            raise ValueError("Truncated record in %s" % f.name)
+        return record
+
+    def __read_header(self, f) -> dict:
+        if f.read(len(self._magic)) != self._magic:
+            raise ValueError("%s is not a MetaSyn msgpack data file" % f.name)
+        return msgpack.unpackb(self.__read_record(f))
+
+    def read_meta(self, path: str) -> dict:
+        with open(path, 'rb') as f:
+            return self.__read_header(f)['meta']
+
+    def iter_items(self, path: str, category: str) -> Iterator:
+        with open(path, 'rb', buffering=1024 * 1024) as f:
+            self.__read_header(f)
+            record = self.__read_record(f)
+            while record is not None:
+                yield msgpack.unpackb(record)
+                record = self.__read_record(f)
+
+STORAGE_FORMATS = {
+    "json": JsonStorage(),
+    "msgpack": MsgpackStorage()
+}
+
+def get_storage(storage_format: str) -> IStorage:
+    try:
+        return STORAGE_FORMATS[storage_format]
+    except KeyError:
+        raise KeyError("Unknown storage format '%s'. Valid options: %s" % (storage_format, list(STORAGE_FORMATS)))
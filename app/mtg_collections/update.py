@@ -1,8 +1,11 @@
 # Tools for polling card data sources and updating the MongoDB as needed
 from abc import ABC, abstractstaticmethod
 from datetime import datetime
-from typing import Collection
+from typing import Collection, Iterator
 
+from pymongo import InsertOne
+
+from app.mtg_collections.bulk import BulkReport, BulkWriter
 from app.mtg_collections.local_data import ILocalData
 
 ###
@@ -12,21 +15,26 @@ class IUpdater(ABC):
     _capitalized_name = None
     _data_endpoint = None
     _identifier = None
+    # On-disk format for the formatted local data ("json" or "msgpack")
+    _storage_format = "json"
+    # Compressed artifact downloaded from _data_endpoint (see compression.COMPRESSION_FORMATS), or None for plain JSON
+    _data_compression = "gz"
+    # Bulk write settings (see bulk.BulkWriter)
+    _bulk_batch_size = 1000
+    _bulk_workers = 4
+    _bulk_retries = 3
 
     def __init__(self, db_collection: Collection):
         # Mongo DB Collection
         self.collection = db_collection
         # Local Data
-        self.local = ILocalData(self.get_collection_name(), self.get_local_file_name(), self._data_endpoint)
+        self.local = ILocalData(self.get_collection_name(), self.get_local_file_name(), self._data_endpoint,
+            self._storage_format, self._data_compression)
 
     @abstractstaticmethod
     def get_items_to_update(self) -> list:
         pass
 
-    @abstractstaticmethod
-    def get_items_to_add(self) -> list:
-        pass
-
     @abstractstaticmethod
     def get_distinct_coll_items(self) -> list:
         pass
@@ -64,7 +72,7 @@ class IUpdater(ABC):
         return self.get_data_endpoint().split("/").pop()
 
     def get_collection_name(self) -> str:
-        return self.collection._Collection__name
+        return self.collection.name
 
     def get_title(self) -> str:
         return self._capitalized_name
@@ -85,6 +93,53 @@ class IUpdater(ABC):
     def print_date_last_updated(self) -> str:
         return self.local.get_date()
 
+    def is_outdated(self) -> bool:
+        return self.local.is_outdated()
+
+    ###
+    # Diff engine (local data vs DB Collection)
+    ###
+    def get_item_key(self, item):
+        # Local items are either dicts that contain the _identifier field, or (e.g. keywords) the identifier itself
+        return item[self._identifier] if isinstance(item, dict) else item
+
+    def to_document(self, item) -> dict:
+        # Converts a local item into the document stored in the DB Collection
+        return item
+
+    def iter_coll_keys(self) -> Iterator:
+        # Streams the _identifier of every document using a projection, rather than building a distinct() list
+        projection = {self._identifier: 1}
+        if self._identifier != '_id':
+            projection['_id'] = 0
+        for doc in self.collection.find({}, projection).batch_size(5000):
+            if self._identifier in doc:
+                yield doc[self._identifier]
+
+    def diff_local_data(self) -> tuple:
+        # Returns (local items missing from the DB Collection, set of DB keys missing from the local data)
+        # using hashed key sets, so the cost is O(n + m)
+        start = datetime.now()
+        coll_keys = set(self.iter_coll_keys())
+        local_keys = set()
+        new_items = []
+        for item in self.local.iter_data():
+            key = self.get_item_key(item)
+            local_keys.add(key)
+            if key not in coll_keys:
+                new_items.append(item)
+        stale_keys = coll_keys - local_keys
+        print("Compared %s local %s with %s in DB in %s" % (len(local_keys), self._capitalized_name, len(coll_keys),
+            datetime.now() - start))
+        return new_items, stale_keys
+
+    def get_items_to_add(self) -> list:
+        new_items, self.stale_items = self.diff_local_data()
+        self.new_items = [self.to_document(item) for item in new_items]
+        if self.stale_items:
+            print(f"{self._capitalized_name} in DB that are no longer in local data: {len(self.stale_items)}")
+        return self.new_items
+
     ###
     # Utility Methods
     ###
@@ -133,24 +188,24 @@ class IUpdater(ABC):
     #     print("Total Time to check DB:", end - start)
     #     return new_items
 
-    def insert_new_items(self) -> dict:
+    def get_bulk_writer(self) -> BulkWriter:
+        return BulkWriter(self.collection, self._bulk_batch_size, self._bulk_workers, self._bulk_retries)
+
+    def bulk_write(self, operations: list) -> BulkReport:
+        # Unordered, batched and concurrent bulk_write with per-batch timing and error reports
+        report = self.get_bulk_writer().write(operations)
+        report.print_batches()
+        print(f"{self._capitalized_name} bulk write: {report}")
+        return report
+
+    def insert_new_items(self) -> BulkReport:
         print("Inserting %s new items into DB..." %
                              (len(self.new_items)))
-        start = datetime.now()
-        db_results = {}
-
-        ### Comment out the next 3 lines when testing to avoid writing to DB
-        try:
-            db_results = self.collection.insert_many(self.new_items)
-            print("Added new items to DB:", db_results)
-        except Exception as e:
-            db_results = e
-            print("Exception while inserting item to DB:", e)
+        ### Comment out the next line when testing to avoid writing to DB
+        db_results = self.bulk_write([InsertOne(item) for item in self.new_items])
 
         ### Use below print() statement for testing to avoid writing to DB
         # print("(TEST) Adding new items to DB: %s" % (str(self.new_items)))
-        end = datetime.now()
-        print("Total Time to insert items into DB:", end - start)
         return db_results
 
     def update_items(self) -> dict:
@@ -0,0 +1,47 @@
+# Keyset pagination and NDJSON streaming for large card queries
+from typing import Iterable, Iterator
+import base64
+
+import bson
+from bson.errors import BSONError
+
+from app.serialization import dumps
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(last_id) -> str:
+    # Opaque to clients: the BSON-encoded _id of the last document sent, so any _id type (ObjectId, str, int) works
+    return base64.urlsafe_b64encode(bson.encode({"_id": last_id})).decode('ascii')
+
+def decode_cursor(cursor: str):
+    try:
+        return bson.decode(base64.urlsafe_b64decode(cursor.encode('ascii')))["_id"]
+    except (BSONError, KeyError, ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor: %s" % cursor) from e
+
+def paginate(cursor, limit: int) -> tuple:
+    # Returns (documents without _id, cursor for the next page or None if this is the last page)
+    # `cursor` must be sorted by _id and limited to limit + 1 documents, so the last page is detected without a count
+    documents = list(cursor)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1]["_id"])
+    for document in documents:
+        document.pop("_id")
+    return documents, next_cursor
+
+def iter_ndjson(documents: Iterable[dict], limit: int=None) -> Iterator[bytes]:
+    # Yields one JSON document per line. If `limit` documents were sent and more remain, a final
+    # {"nextCursor": <cursor>} line tells the client where to continue
+    # (`documents` must then be sorted by _id and limited to limit + 1)
+    sent = 0
+    last_id = None
+    for document in documents:
+        if limit is not None and sent == limit:
+            yield dumps({"nextCursor": encode_cursor(last_id)}) + b"\n"
+            return
+        last_id = document.pop("_id", None)
+        sent += 1
+        yield dumps(document) + b"\n"
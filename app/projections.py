@@ -0,0 +1,38 @@
+# Projections of the queries made by the API routes, shared with the DB Manager's explain report (indexes.py)
+
+SETS_PROJECTION = {"_id": 0, "code": 1}
+
+KEYWORDS_PROJECTION = {"_id": 0, "keyword": 1}
+
+TYPES_PROJECTION = {"_id": 0, "type": 1}
+
+SUBTYPES_PROJECTION = {"_id": 0, "subtypes": 1}
+
+# Fields sent to the frontend for each card (_id is only used for pagination and is removed before sending)
+GATHER_CARDS_PROJECTION = {
+    'name': 1,
+    'type': 1,
+    'types': 1,
+    'subtypes': 1,
+    'power': 1,
+    'toughness': 1,
+    'multiverseId': 1,
+    'colors': 1,
+    'colorIdentity': 1,
+    'cmc': 1,
+    'setCode': 1,
+    'keywords': 1,
+    'text': 1
+}
+
+# Fields of the selected card in /api/synergize (see card_index.CardProfile)
+CARD_PROFILE_PROJECTION = {
+    '_id': 0,
+    'name': 1,
+    'colorIdentity': 1,
+    'colors': 1,
+    'types': 1,
+    'subtypes': 1,
+    'keywords': 1,
+    'text': 1
+}
@@ -0,0 +1,131 @@
+# In-process cache of serialized API responses, invalidated by a data-version stamp in the DB
+from datetime import datetime
+from functools import wraps
+from threading import Lock
+from typing import Callable, Collection
+import hashlib
+import time
+
+from flask import Response, request, make_response
+from pymongo import ReturnDocument
+
+###
+# The data version is a counter in the meta collection ({_id: "data_version", version: <int>, updated: <date>})
+# Manager bumps it after each sync. Readers check it at most once every `ttl` seconds, and the callbacks
+# registered with on_change() run when a check finds a new version
+###
+class DataVersion():
+    _id = "data_version"
+
+    def __init__(self, collection: Collection, ttl: float=5.0):
+        self.collection = collection
+        self.ttl = ttl
+        self.__version = None
+        self.__checked_at = 0.0
+        self.__lock = Lock()
+        self.__callbacks = []
+
+    def on_change(self, callback: Callable) -> None:
+        self.__callbacks.append(callback)
+
+    def get(self) -> int:
+        changed = False
+        with self.__lock:
+            now = time.monotonic()
+            if self.__version is None or now - self.__checked_at >= self.ttl:
+                stamp = self.collection.find_one({"_id": self._id}, {"version": 1})
+                version = stamp["version"] if stamp else 0
+                changed = self.__version is not None and version != self.__version
+                self.__version = version
+                self.__checked_at = now
+            version = self.__version
+        if changed:
+            self.__notify(version)
+        return version
+
+    def __notify(self, version: int) -> None:
+        print("Data version changed to", version)
+        for callback in self.__callbacks:
+            callback()
+
+    def check(self) -> None:
+        # For app.before_request (which must return None)
+        self.get()
+
+    def bump(self) -> int:
+        stamp = self.collection.find_one_and_update({"_id": self._id},
+            {"$inc": {"version": 1}, "$set": {"updated": datetime.utcnow()}},
+            upsert=True, return_document=ReturnDocument.AFTER)
+        with self.__lock:
+            changed = self.__version is not None and stamp["version"] != self.__version
+            self.__version = stamp["version"]
+            self.__checked_at = time.monotonic()
+        print("Data version bumped to", stamp["version"])
+        if changed:
+            self.__notify(stamp["version"])
+        return stamp["version"]
+
+###
+# Caches the body of each (path, query args) response with a strong ETag (SHA-256 of the body)
+# Every entry is dropped when the data version changes, and clients that send a matching If-None-Match get a 304
+###
+class ResponseCache():
+    def __init__(self, data_version: DataVersion, max_entries: int=256):
+        self.data_version = data_version
+        self.max_entries = max_entries
+        self.__entries = {}
+        self.__version = None
+        self.__lock = Lock()
+
+    ###
+    # Private methods
+    ###
+    def __get_key(self) -> tuple:
+        return (request.path, tuple(sorted(request.args.items(multi=True))))
+
+    def __get_entry(self, key: tuple, version: int) -> dict:
+        with self.__lock:
+            if version != self.__version:
+                self.__entries = {}
+                self.__version = version
+            return self.__entries.get(key)
+
+    def __add_entry(self, key: tuple, version: int, entry: dict) -> None:
+        with self.__lock:
+            if version != self.__version:
+                return
+            if len(self.__entries) >= self.max_entries:
+                # Drop the oldest entry (dicts keep insertion order)
+                self.__entries.pop(next(iter(self.__entries)))
+            self.__entries[key] = entry
+
+    def __render(self, view: Callable, *args, **kwargs) -> dict:
+        response = make_response(view(*args, **kwargs))
+        body = response.get_data()
+        return {"body": body, "status": response.status_code, "mimetype": response.mimetype,
+            "etag": hashlib.sha256(body).hexdigest()}
+
+    ###
+    # Utility Methods
+    ###
+    def cached(self, view: Callable) -> Callable:
+        # Decorator for GET views whose response only depends on the request's path, query args and the DB data
+        @wraps(view)
+        def cached_view(*args, **kwargs):
+            key = self.__get_key()
+            version = self.data_version.get()
+            entry = self.__get_entry(key, version)
+            if entry is None:
+                entry = self.__render(view, *args, **kwargs)
+                if entry["status"] == 200:
+                    self.__add_entry(key, version, entry)
+            response = Response(entry["body"], status=entry["status"], mimetype=entry["mimetype"])
+            response.set_etag(entry["etag"])
+            # Clients may reuse their copy, but must revalidate it with If-None-Match first
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
+        return cached_view
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries = {}
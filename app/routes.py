@@ -1,8 +1,11 @@
-from flask import request, jsonify
-from itertools import starmap
+from flask import Response, request, jsonify, stream_with_context
 
-from app import app, db
-from app.synergy import CardSynergy
+from app import app, db, card_index, card_pool, response_cache, synergy_index
+from app.projections import (GATHER_CARDS_PROJECTION, KEYWORDS_PROJECTION, SETS_PROJECTION, SUBTYPES_PROJECTION,
+    TYPES_PROJECTION)
+from app.pagination import InvalidCursor, decode_cursor, iter_ndjson, paginate
+from app.serialization import json_response
+from app.synergy import CardSynergy, top_synergy_scores
 
 
 @app.route('/api', methods=['GET'])
@@ -11,8 +14,9 @@ def api():
 
 
 @app.route('/api/sets', methods=['GET'])
+@response_cache.cached
 def sets():
-    sets_cursor = db.sets.find({}, {"_id": 0, "code": 1}).sort("code")
+    sets_cursor = db.sets.find({}, SETS_PROJECTION).sort("code")
     sets = []
     for set in list(sets_cursor):
         sets.append(set['code'])
@@ -20,11 +24,9 @@ def sets():
 
 
 @app.route('/api/keywords', methods=['GET'])
+@response_cache.cached
 def keywords():
-    keywords_cursor = db.keywords.find({}, {
-        "_id": 0,
-        "keyword": 1
-    }).sort("keyword")
+    keywords_cursor = db.keywords.find({}, KEYWORDS_PROJECTION).sort("keyword")
     keywords = []
     for keyword in list(keywords_cursor):
         keywords.append(keyword['keyword'])
@@ -32,12 +34,9 @@ def keywords():
 
 
 @app.route('/api/types', methods=['GET'])
+@response_cache.cached
 def types():
-    card_types_cursor = list(
-        db.types.find({}, {
-            "_id": 0,
-            "type": 1
-        }).sort("type"))
+    card_types_cursor = list(db.types.find({}, TYPES_PROJECTION).sort("type"))
     card_types = []
     for card_type in card_types_cursor:
         card_types.append(card_type['type'])
@@ -45,6 +44,7 @@ def types():
 
 
 @app.route('/api/subtypes', methods=['GET'])
+@response_cache.cached
 def subtypes():
     if not request.args.get('type') or request.args.get('type') == "undefined":
         return jsonify(["Select a Type"])
@@ -52,49 +52,69 @@ def subtypes():
         selected_type = request.args.get('type')
         subtypes_dict = db.types.find({
             "type": selected_type
-        }, {
-            "_id": 0,
-            "subtypes": 1
-        }).sort("subtypes").next()
+        }, SUBTYPES_PROJECTION).sort("subtypes").next()
         subtypes = subtypes_dict['subtypes']
         return jsonify(subtypes)
 
 
 @app.route('/api/gatherCards', methods=['POST'])
 def gatherCards():
+    ###
+    # Body: {"setCode": <code>, "limit": <int> (optional), "cursor": <nextCursor of the previous page> (optional)}
+    # With a limit (or cursor) the response is a page: {"cards": [...], "nextCursor": <cursor or null>}
+    # With "Accept: application/x-ndjson" cards are streamed one per line as they are read from the DB
+    ###
     data = request.get_json()
-    cardsCursor = db.AllCards.find({'setCode': data['setCode']}, {
-        '_id': 0,
-        'name': 1,
-        'type': 1,
-        'types': 1,
-        'subtypes': 1,
-        'power': 1,
-        'toughness': 1,
-        'multiverseId': 1,
-        'colors': 1,
-        'colorIdentity': 1,
-        'cmc': 1,
-        'setCode': 1,
-        'keywords': 1,
-        'text': 1
-    })
+    query = {'setCode': data['setCode']}
+    try:
+        limit = data.get('limit')
+        if limit is not None:
+            limit = max(1, min(int(limit), app.config['GATHER_CARDS_MAX_LIMIT']))
+        if data.get('cursor'):
+            query['_id'] = {'$gt': decode_cursor(data['cursor'])}
+            limit = limit or app.config['GATHER_CARDS_MAX_LIMIT']
+    except (InvalidCursor, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    cards_cursor = db.AllCards.find(query, GATHER_CARDS_PROJECTION).batch_size(app.config['GATHER_CARDS_BATCH_SIZE'])
+    if limit is not None:
+        # Keyset pagination: one extra card tells whether there is a next page
+        cards_cursor = cards_cursor.sort('_id').limit(limit + 1)
+    if request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson':
+        return Response(stream_with_context(iter_ndjson(cards_cursor, limit)), mimetype='application/x-ndjson')
+    if limit is not None:
+        cards, next_cursor = paginate(cards_cursor, limit)
+        return json_response({"cards": cards, "nextCursor": next_cursor})
     cards = []
-    for card in list(cardsCursor):
+    for card in cards_cursor:
+        card.pop('_id')
         cards.append(card)
-    return jsonify(cards)
+    return json_response(cards)
 
 
 @app.route('/api/synergize', methods=['POST'])
 def synergize():
-    selected_card_id = request.args.get('card')
-    data = request.get_json()
-    results = []
-    for card in data['otherCards']:
-        print("~~ Synergizing", card['name'], "~~")
-        synergy_obj = CardSynergy(selected_card_id)
-        scores = (card["name"], synergy_obj.get_relative_synergy_scores(card))
-        results.append(scores)
-    results.sort(key=lambda card: card[1].overall)
-
-    return jsonify(results)
+    card_id = request.args.get('card')
+    if not card_id:
+        return jsonify({"error": "Missing 'card' query argument"}), 400
+    selected_card = card_index.get_profile(card_id)
+    data = request.get_json(silent=True) or {}
+    other_cards = data.get('otherCards')
+    if other_cards is not None:
+        # A card is never its own synergy partner
+        other_cards = [card for card in other_cards if card.get('name') != selected_card.name]
+    # Serve from the precomputed synergy index when it covers the request
+    results = synergy_index.lookup(selected_card.name, other_cards)
+    if results is None:
+        # One snapshot of the card pool per request. Score with the matcher its keyword postings were built with
+        pool = card_pool.get()
+        synergy = CardSynergy(selected_card, pool.keyword_matcher)
+        if other_cards is None:
+            # Whole card pool: the top K of the candidates (cards that share a keyword or subtype with the selected
+            # card, or else fit within its color identity), like the synergy index. Cards sent by the client are
+            # all scored
+            other_cards = pool.get_candidate_cards(selected_card.name, synergy.selected_keywords,
+                selected_card.subtypes, selected_card.color_mask)
+            results = top_synergy_scores(synergy.get_batch_synergy_scores(other_cards), synergy_index.k)
+        else:
+            results = synergy.get_batch_synergy_scores(other_cards)
+    return json_response(results)
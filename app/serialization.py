@@ -0,0 +1,68 @@
+# JSON serialization and response compression for the API
+# orjson and brotli are optional: without them responses use the json module and gzip
+import gzip
+import json
+
+from flask import Response, current_app, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Mimetypes worth compressing
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/html", "text/plain")
+
+def _default(obj):
+    # Namedtuples (e.g. RelativeSynergy) are sent as lists, numpy scalars & arrays as numbers & lists
+    if isinstance(obj, tuple):
+        return list(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError("Type is not JSON serializable: %s" % type(obj).__name__)
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def json_response(obj, status: int=200) -> Response:
+    # Drop-in replacement for jsonify() that uses the fastest available encoder
+    return Response(dumps(obj), status=status, mimetype="application/json")
+
+###
+# Compression (registered as an after_request handler)
+###
+def get_encodings() -> list:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=current_app.config['COMPRESSION_BROTLI_QUALITY'])
+    return gzip.compress(body, compresslevel=current_app.config['COMPRESSION_GZIP_LEVEL'])
+
+def compress_response(response: Response) -> Response:
+    # Compresses complete (non-streamed) responses of at least COMPRESSION_MIN_SIZE bytes using the best encoding
+    # the client accepts. Streamed responses (e.g. NDJSON) are sent as is, so their first bytes aren't delayed
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers):
+        return response
+    encoding = request.accept_encodings.best_match(get_encodings())
+    body = response.get_data()
+    if encoding is None or len(body) < current_app.config['COMPRESSION_MIN_SIZE']:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    # The compressed body is a different representation, so a strong ETag becomes weak (If-None-Match still matches)
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
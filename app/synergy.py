@@ -1,60 +1,75 @@
-from collections import defaultdict, namedtuple
-from itertools import count
-from mtgsdk import Card
+from collections import namedtuple
 
-from app.metasyn import Utils
+import numpy as np
+
+from app.card_index import CardProfile
+from app.features import CardFeatures, popcount
+from app.keyword_matcher import KeywordMatcher
+from app.metasyn import color_mask, color_synergy
+
+RelativeSynergy = namedtuple('RelativeSynergy', ["evaluated_cards", "color_synergy", "keyword_synergy", "overall"])
+
+def top_synergy_scores(results: list, k: int) -> list:
+    # The k best of a list returned by get_batch_synergy_scores (on ties, the card that came first wins),
+    # still sorted by overall score
+    best = sorted(range(len(results)), key=lambda i: -results[i][1].overall)[:k]
+    return [results[i] for i in sorted(best)]
 
 class CardSynergy():
-    def __init__(self, card_id):
-        self.selected_card = Card.find(card_id)
-        self.scores = {
-            "color_synergies": Utils().get_color_synergies(self.selected_card.color_identity), 
-            "keyword_synergies": None
-        }
+    def __init__(self, selected_card: CardProfile, keyword_matcher: KeywordMatcher):
+        self.selected_card = selected_card
+        self.keyword_matcher = keyword_matcher
+        self.selected_keywords = keyword_matcher.scan(selected_card.text) | keyword_matcher.bits(selected_card.keywords)
 
     def _calc_relative_color_syn(self, card_b_colors):
         ###
-        # Tallies a score integer by comparing color_synergies of the selected card with another's
-        # via the Utils().get_color_synergies() utility function
+        # Number of color combos that both the selected card and the other card fit within,
+        # looked up from the precomputed color synergy table
         # Colorless cards synergize with all colors
         ###
-        clr_synergy = 0
-        card_b_synergies = Utils().get_color_synergies(card_b_colors)
-        print(card_b_synergies)
-        for clr_combo in card_b_synergies:
-            if clr_combo and self.scores['color_synergies'][clr_combo]:
-                clr_synergy += 1
-        return clr_synergy
+        return color_synergy(self.selected_card.color_mask, color_mask(card_b_colors))
 
     def _calc_keyword_abilities(self, card_b):
         ###
-        # 
+        # Number of keywords shared by the selected card and the other card (intersection of their keyword bitsets)
         ###
-        abil_synergy = 0
-        try:
-            print("$$$A ->", self.selected_card.text)
-        except:
-            print("--- A has NO TEXT ---")
-        try:
-            print("$$$B ->", card_b["text"])
-        except:
-            print("--- B has NO TEXT ---")
-        finally:
-            return abil_synergy
+        return (self.selected_keywords & self.keyword_matcher.card_bits(card_b)).bit_count()
 
     def get_relative_synergy_scores(self, comp_card):
         ###
         # Analyzes selected card's synergy in relation to one other card and returns a RelativeSynergy object with the relative synergy scores
         ###
-        print(comp_card)
-        RelativeSynergy = namedtuple('RelativeSynergy', ["evaluated_cards", "color_synergy", "keyword_synergy", "overall"])
         color_syn = self._calc_relative_color_syn(comp_card['colors'])
         keyword_syn = self._calc_keyword_abilities(comp_card)
         overall = color_syn + keyword_syn
-        
-        synergy_scores = RelativeSynergy({"selectedCard": self.selected_card.name, "compCard": comp_card['name']}, 
+
+        synergy_scores = RelativeSynergy({"selectedCard": self.selected_card.name, "compCard": comp_card['name']},
             color_syn,
             keyword_syn,
             overall
         )
         return synergy_scores
+
+    def get_batch_synergy_scores(self, comp_cards: list) -> list:
+        ###
+        # Analyzes selected card's synergy in relation to N other cards at once.
+        # The other cards are converted into columnar arrays (color masks, keyword bitsets) a single time,
+        # then every score is computed as a NumPy operation over all N cards.
+        # Returns a list of (card name, RelativeSynergy) tuples sorted by overall score
+        ###
+        features = CardFeatures(comp_cards, self.keyword_matcher)
+        selected_keywords = np.frombuffer(self.selected_keywords.to_bytes(self.keyword_matcher.width, 'little'), dtype=np.uint8)
+
+        color_syn = color_synergy(self.selected_card.color_mask, features.color_masks)
+        keyword_syn = popcount(features.keyword_bits & selected_keywords)
+        overall = color_syn + keyword_syn
+
+        results = []
+        for i in np.argsort(overall, kind='stable'):
+            name = features.names[i]
+            results.append((name, RelativeSynergy({"selectedCard": self.selected_card.name, "compCard": name},
+                int(color_syn[i]),
+                int(keyword_syn[i]),
+                int(overall[i])
+            )))
+        return results
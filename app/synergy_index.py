@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import Collection
+
+import numpy as np
+
+from app.features import CardFeatures
+from app.inverted_index import CardPool
+from app.metasyn import COLOR_SYNERGY_TABLE, color_mask, color_masks
+from app.synergy import RelativeSynergy
+
+# Number of synergy partners stored per card
+SYNERGY_INDEX_K = 100
+
+###
+# Offline builder for each card's top-K synergistic partners in the card pool (see inverted_index.CardPool)
+# Like a whole-pool /api/synergize request, only a card's candidates are ranked, with ties going to the card that
+# comes first in the pool, so the index answers exactly what the live path would
+# Scores are computed one block of selected cards at a time (block_size x N matrices) to keep memory bounded.
+# The index is built into a scratch collection that replaces the live one when complete
+###
+class SynergyIndexBuilder():
+    def __init__(self, pool: CardPool, index_collection: Collection, k: int=SYNERGY_INDEX_K, block_size: int=128):
+        self.pool = pool
+        self.index = index_collection
+        self.k = k
+        self.block_size = block_size
+
+    ###
+    # Private methods
+    ###
+    def __get_candidate_mask(self, start: int, stop: int) -> np.ndarray:
+        # Row i marks the candidates of card start + i (never the card itself)
+        mask = np.zeros((stop - start, len(self.pool)), dtype=bool)
+        for i in range(stop - start):
+            card = self.pool.cards[start + i]
+            candidate_ids = self.pool.candidates(self.pool.keyword_matcher.card_bits(card), card.get('subtypes'),
+                color_mask(card.get('colorIdentity')))
+            mask[i, np.fromiter(candidate_ids, dtype=np.int64, count=len(candidate_ids))] = True
+            mask[i, start + i] = False
+        return mask
+
+    def __build_block(self, start: int, stop: int, features: CardFeatures, selected_masks: np.ndarray,
+            keyword_matrix: np.ndarray) -> list:
+        rows = np.arange(stop - start)
+        color_syn = COLOR_SYNERGY_TABLE[selected_masks[start:stop, None], features.color_masks[None, :]]
+        keyword_syn = (keyword_matrix[start:stop] @ keyword_matrix.T).astype(np.int64)
+        overall = color_syn + keyword_syn
+        # One distinct rank key per candidate: higher scores first, then the card that comes first in the pool
+        # Cards that aren't candidates get -1
+        n = len(features)
+        rank = np.where(self.__get_candidate_mask(start, stop), overall * n + (n - 1 - np.arange(n)), -1)
+        k = min(self.k, n)
+        top = np.argpartition(-rank, k - 1, axis=1)[:, :k]
+        top = top[rows[:, None], np.argsort(-rank[rows[:, None], top], axis=1)]
+
+        docs = []
+        for i in rows:
+            selected_name = features.names[start + i]
+            docs.append({
+                "_id": selected_name,
+                "neighbors": [[features.names[j], int(color_syn[i, j]), int(keyword_syn[i, j]), int(overall[i, j])]
+                    for j in top[i] if rank[i, j] >= 0]
+            })
+        return docs
+
+    ###
+    # Utility Methods
+    ###
+    def build(self) -> int:
+        print(f"Building top-{self.k} synergy index...")
+        start_time = datetime.now()
+        cards = self.pool.cards
+        keyword_matcher = self.pool.keyword_matcher
+        features = CardFeatures(cards, keyword_matcher)
+        selected_masks = color_masks(card.get('colorIdentity') for card in cards)
+        keyword_matrix = np.unpackbits(features.keyword_bits, axis=1, bitorder='little')[:, :len(keyword_matcher)]
+        keyword_matrix = keyword_matrix.astype(np.float32)
+
+        # lookup() keeps reading the previous index until the new one is complete
+        scratch = self.index.database[self.index.name + "_build"]
+        scratch.drop()
+        total = 0
+        for start in range(0, len(features), self.block_size):
+            stop = min(start + self.block_size, len(features))
+            docs = self.__build_block(start, stop, features, selected_masks, keyword_matrix)
+            scratch.insert_many(docs)
+            total += len(docs)
+        if total:
+            scratch.rename(self.index.name, dropTarget=True)
+        else:
+            self.index.drop()
+        print(f"Indexed synergy partners for {total} cards. Total Time to build synergy index: {datetime.now() - start_time}")
+        return total
+
+###
+# Read side of the precomputed synergy index used by /api/synergize
+###
+class SynergyIndex():
+    def __init__(self, index_collection: Collection, k: int=SYNERGY_INDEX_K):
+        self.index = index_collection
+        # The K the index was built with. More comp cards than that can never all be covered
+        self.k = k
+
+    def lookup(self, card_name: str, comp_cards: list=None) -> list:
+        ###
+        # Returns precomputed (card name, RelativeSynergy) tuples sorted by overall score, or None if the
+        # index has no entry for the card or does not cover every requested card (which is always the case when
+        # more than k cards are requested, so those are answered without a DB round trip)
+        # Without comp_cards, returns the card's top-K partners (the live path's top_synergy_scores())
+        # The selected card is never one of its own partners, so it is left out of comp_cards
+        ###
+        if comp_cards is not None:
+            comp_cards = [card for card in comp_cards if card['name'] != card_name]
+            if len(comp_cards) > self.k:
+                return None
+        entry = self.index.find_one({"_id": card_name})
+        if entry is None:
+            return None
+        neighbors = entry['neighbors']
+        if comp_cards is not None:
+            by_name = {neighbor[0]: neighbor for neighbor in neighbors}
+            names = [card['name'] for card in comp_cards]
+            if not all(name in by_name for name in names):
+                return None
+            neighbors = [by_name[name] for name in names]
+        results = [(name, RelativeSynergy({"selectedCard": card_name, "compCard": name}, color_syn, keyword_syn, overall))
+            for name, color_syn, keyword_syn, overall in neighbors]
+        results.sort(key=lambda card: card[1].overall)
+        return results
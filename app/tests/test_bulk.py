@@ -0,0 +1,56 @@
+import unittest
+
+import mongomock
+from pymongo import InsertOne
+from pymongo.errors import AutoReconnect
+
+from app.mtg_collections.bulk import BulkWriter
+
+class FlakyCollection():
+    # Fails the first `failures` bulk_writes with a transient error, then delegates to a real collection
+    def __init__(self, collection, failures: int):
+        self.collection = collection
+        self.failures = failures
+
+    def bulk_write(self, requests, ordered=True):
+        if self.failures > 0:
+            self.failures -= 1
+            raise AutoReconnect("connection reset")
+        return self.collection.bulk_write(requests, ordered=ordered)
+
+class TestBulkWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.keywords
+
+    def test_writes_in_batches(self):
+        report = BulkWriter(self.collection, batch_size=10, workers=3).write(
+            InsertOne({"_id": i}) for i in range(25))
+        self.assertEqual([batch["size"] for batch in report.batches], [10, 10, 5])
+        self.assertEqual(report.get_totals()["inserted"], 25)
+        self.assertEqual(self.collection.count_documents({}), 25)
+
+    def test_duplicate_does_not_abort_batch(self):
+        self.collection.insert_one({"_id": 3})
+        report = BulkWriter(self.collection, batch_size=10).write([InsertOne({"_id": i}) for i in range(6)])
+        totals = report.get_totals()
+        self.assertEqual(totals["inserted"], 5)
+        self.assertEqual(totals["duplicates"], 1)
+        self.assertEqual(totals["errors"], 0)
+        self.assertEqual(self.collection.count_documents({}), 6)
+
+    def test_retries_transient_errors(self):
+        flaky = FlakyCollection(self.collection, failures=2)
+        report = BulkWriter(flaky, batch_size=10, retries=3, backoff=0).write([InsertOne({"_id": 1})])
+        self.assertEqual(report.batches[0]["attempts"], 3)
+        self.assertEqual(report.get_totals()["inserted"], 1)
+
+    def test_gives_up_after_retries(self):
+        flaky = FlakyCollection(self.collection, failures=5)
+        report = BulkWriter(flaky, batch_size=10, retries=1, backoff=0).write([InsertOne({"_id": 1})])
+        self.assertEqual(report.batches[0]["attempts"], 2)
+        self.assertEqual(report.get_totals()["errors"], 1)
+        self.assertEqual(self.collection.count_documents({}), 0)
+
+if __name__ == '__main__':
+    unittest.main()
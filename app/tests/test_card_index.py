@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import mongomock
+
+from app.card_index import CardIndex
+from app.mtg_collections.card_store import write_card_store
+from app.response_cache import DataVersion
+
+class TestCardIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.card_store_path = os.path.join(self.data_dir, "AtomicCards.cardstore")
+        self.collection = mongomock.MongoClient().db.AllCards
+        self.collection.insert_many([
+            {"name": "Llanowar Elves", "multiverseId": "1", "colorIdentity": ["G"], "types": ["Creature"],
+                "subtypes": ["Elf"], "text": "{T}: Add {G}."},
+            {"name": "Shock", "multiverseId": 2, "colorIdentity": ["R"], "types": ["Instant"],
+                "text": "Shock deals 2 damage to any target."}
+        ])
+        write_card_store(self.card_store_path, [
+            {"name": "Opt", "scryfallOracleId": "oracle-opt", "colorIdentity": ["U"], "types": ["Instant"],
+                "keywords": ["Scry"], "text": "Scry 1. Draw a card."}
+        ])
+        self.index = CardIndex(self.collection, 8, self.card_store_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_lookup_by_multiverse_id_stored_as_str_or_int(self):
+        self.assertEqual(self.index.get_profile("1").subtypes, ["Elf"])
+        self.assertEqual(self.index.get_profile("2").name, "Shock")
+
+    def test_miss_falls_back_to_card_find(self):
+        sdk_card = mock.Mock(color_identity=["W"], colors=["W"], types=["Creature"], subtypes=["Angel"],
+            text="Flying, vigilance")
+        sdk_card.name = "Serra Angel"
+        with mock.patch("app.card_index.Card.find", return_value=sdk_card) as find:
+            profile = self.index.get_profile("999")
+        find.assert_called_once_with("999")
+        self.assertEqual(profile.name, "Serra Angel")
+        self.assertEqual(profile.color_identity, ["W"])
+
+    def test_repeated_lookup_is_served_from_cache(self):
+        with mock.patch.object(self.collection, "find_one", wraps=self.collection.find_one) as find_one:
+            first = self.index.get_profile("1")
+            second = self.index.get_profile("1")
+        self.assertIs(first, second)
+        self.assertEqual(find_one.call_count, 1)
+
+    def test_data_version_change_clears_cache(self):
+        meta = mongomock.MongoClient().db.meta
+        data_version = DataVersion(meta, ttl=0)
+        data_version.on_change(self.index.clear)
+        data_version.get()
+        self.assertEqual(self.index.get_profile("1").subtypes, ["Elf"])
+        self.collection.update_one({"multiverseId": "1"}, {"$set": {"subtypes": ["Elf", "Druid"]}})
+        self.assertEqual(self.index.get_profile("1").subtypes, ["Elf"])
+        data_version.bump()
+        data_version.get()
+        self.assertEqual(self.index.get_profile("1").subtypes, ["Elf", "Druid"])
+
+    def test_card_store_lookup_by_oracle_id_or_name(self):
+        self.assertEqual(self.index.get_profile("oracle-opt").keywords, ["Scry"])
+        self.assertEqual(self.index.get_profile("Opt").color_identity, ["U"])
+
+    def test_card_store_is_remapped_after_clear(self):
+        self.assertEqual(self.index.get_profile("Opt").name, "Opt")
+        write_card_store(self.card_store_path, [{"name": "Ponder", "scryfallOracleId": "oracle-ponder",
+            "text": "Look at the top three cards of your library."}])
+        self.index.clear()
+        self.assertEqual(self.index.get_profile("Ponder").name, "Ponder")
+
+if __name__ == '__main__':
+    unittest.main()
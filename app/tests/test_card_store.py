@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.mtg_collections.card_store import CardStore, write_card_store
+
+class TestCardStore(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.data_dir, "AtomicCards.cardstore")
+        self.cards = [
+            {"name": "Shock", "scryfallOracleId": "oracle-shock", "colorIdentity": ["R"], "manaValue": 1.0},
+            {"name": "Fire // Ice", "faceName": "Fire", "scryfallOracleId": "oracle-fire-ice", "side": "a"},
+            {"name": "Fire // Ice", "faceName": "Ice", "scryfallOracleId": "oracle-fire-ice", "side": "b"},
+            {"name": "Opt", "scryfallOracleId": "oracle-opt", "keywords": ["Scry"]}
+        ]
+        self.assertEqual(write_card_store(self.path, self.cards), 4)
+        self.store = CardStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.data_dir)
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.store), 4)
+        for card in self.cards:
+            self.assertIn(card, self.store.find_by_oracle_id(card['scryfallOracleId']))
+        self.assertEqual(self.store.find_by_name("Opt"), [self.cards[3]])
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_multi_faced_card_by_oracle_id(self):
+        faces = self.store.find_by_oracle_id("oracle-fire-ice")
+        self.assertEqual(sorted(face['faceName'] for face in faces), ["Fire", "Ice"])
+
+    def test_lookup_by_face_name(self):
+        self.assertEqual(self.store.find_by_name("Ice"), [self.cards[2]])
+        self.assertEqual(len(self.store.find_by_name("Fire // Ice")), 2)
+
+    def test_missing_key(self):
+        self.assertEqual(self.store.find_by_oracle_id("oracle-missing"), [])
+        self.assertEqual(self.store.find_by_name("Black Lotus"), [])
+
+    def test_reload_after_rewrite(self):
+        write_card_store(self.path, [{"name": "Ponder", "scryfallOracleId": "oracle-ponder"}])
+        # The current mapping keeps reading the previous file until reload()
+        self.assertEqual(len(self.store.find_by_name("Shock")), 1)
+        self.store.reload()
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.find_by_name("Shock"), [])
+        self.assertEqual(self.store.find_by_name("Ponder")[0]['scryfallOracleId'], "oracle-ponder")
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            self.store.reload()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mongomock
+
+from app.mtg_collections.mtg_cards import CardsUpdater
+
+def raw_cards(date: str, cards: dict) -> bytes:
+    # AtomicCards.json as published by mtgjson, from {name: text}
+    data = {name: [{"name": name, "text": text, "identifiers": {"scryfallOracleId": "oracle-" + name}}]
+        for name, text in cards.items()}
+    return json.dumps({"meta": {"date": date}, "data": data}).encode()
+
+class TestCardsSync(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.collection = mongomock.MongoClient().db.cards
+        self.updater = CardsUpdater(self.collection)
+        self.updater._bulk_workers = 1
+        self.updater.local._data_dir_path = self.data_dir + os.sep
+        self.cards = {name: "Flying" for name in ["Shock", "Opt", "Ponder", "Brainstorm", "Preordain", "Duress",
+            "Negate", "Divination"]}
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def format(self, date: str, cards: dict) -> None:
+        with open(os.path.join(self.data_dir, "newAtomicCards.json"), 'wb') as f:
+            f.write(raw_cards(date, cards))
+        self.updater.local.format_and_save()
+
+    def get_names(self) -> set:
+        return {card['name'] for card in self.collection.find({}, {'name': 1})}
+
+    def test_first_sync_inserts_every_card(self):
+        self.format("2021-06-01", self.cards)
+        report = self.updater.sync()
+        self.assertEqual((report['inserted'], report['modified'], report['deleted']), (8, 0, 0))
+        self.assertEqual(report['errors'], [])
+        self.assertEqual(self.get_names(), set(self.cards))
+
+    def test_sync_applies_only_the_changes(self):
+        self.format("2021-06-01", self.cards)
+        self.updater.sync()
+        cards = dict(self.cards, Opt="Scry 1. Draw a card.", Lightning="Haste")
+        del cards["Duress"]
+        self.format("2021-07-01", cards)
+        report = self.updater.sync()
+        self.assertEqual((report['inserted'], report['modified'], report['deleted']), (1, 1, 1))
+        self.assertEqual(self.get_names(), set(cards))
+        self.assertEqual(self.collection.find_one({'name': 'Opt'})['text'], "Scry 1. Draw a card.")
+
+    def test_up_to_date_report_has_the_same_shape(self):
+        self.format("2021-06-01", self.cards)
+        first = self.updater.sync()
+        second = self.updater.sync()
+        self.assertEqual(set(second), set(first))
+        self.assertEqual((second['inserted'], second['modified'], second['deleted']), (0, 0, 0))
+
+    def test_truncated_local_data_aborts_sync(self):
+        self.format("2021-06-01", self.cards)
+        self.updater.sync()
+        path = os.path.join(self.data_dir, "AtomicCards.msgpack")
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) // 3)
+        with self.assertRaises(Exception):
+            self.updater.sync()
+        self.assertEqual(self.get_names(), set(self.cards))
+
+    def test_refuses_to_delete_most_of_the_collection(self):
+        self.format("2021-06-01", self.cards)
+        self.updater.sync()
+        self.format("2021-07-01", {"Shock": "Flying", "Opt": "Flying"})
+        with self.assertRaises(Exception):
+            self.updater.sync()
+        self.assertEqual(self.get_names(), set(self.cards))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+from zipfile import ZipFile
+import bz2
+import gzip
+import io
+import json
+import lzma
+import unittest
+
+from app.mtg_collections.compression import iter_decompressed
+
+def in_chunks(data: bytes, size: int=7) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def zip_bytes(name: str, data: bytes) -> bytes:
+    archive = io.BytesIO()
+    with ZipFile(archive, 'w') as zipped:
+        zipped.writestr(name, data)
+    return archive.getvalue()
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.data = json.dumps({"meta": {"date": "2021-06-01"}, "data": ["Flying"] * 500}).encode()
+
+    def test_decompresses_each_format_in_chunks(self):
+        compressed = {
+            "gz": gzip.compress(self.data),
+            "xz": lzma.compress(self.data),
+            "bz2": bz2.compress(self.data),
+            "zip": zip_bytes("Keywords.json", self.data)
+        }
+        for compression, data in compressed.items():
+            with self.subTest(compression=compression):
+                self.assertEqual(b"".join(iter_decompressed(in_chunks(data), compression)), self.data)
+
+    def test_passes_through_uncompressed_chunks(self):
+        self.assertEqual(b"".join(iter_decompressed(in_chunks(self.data))), self.data)
+
+    def test_unknown_format(self):
+        with self.assertRaises(KeyError):
+            iter_decompressed([self.data], "rar")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.mtg_collections.local_data import ILocalData
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Serves Meta.json and Keywords.json like mtgjson, answering 304 when the client's ETag matches
+    etag = '"v1"'
+    date = "2021-06-01"
+    missing = False
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path.endswith("/Meta.json"):
+            body = json.dumps({"meta": {"date": self.date}, "data": {"date": self.date}}).encode()
+        elif self.path.endswith("/Keywords.json") and not self.missing:
+            if self.headers.get('If-None-Match') == self.etag:
+                self.send_response(304)
+                self.send_header("ETag", self.etag)
+                self.end_headers()
+                return
+            body = json.dumps({"meta": {"date": self.date}, "data": {"abilityWords": ["Landfall"],
+                "keywordAbilities": ["Flying"], "keywordActions": ["Scry"]}}).encode()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", "Tue, 01 Jun 2021 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(body)
+
+class TestConditionalDownload(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StandInHandler.requests = []
+        StandInHandler.date = "2021-06-01"
+        StandInHandler.missing = False
+        self.data_dir = tempfile.mkdtemp()
+        endpoint = "http://127.0.0.1:%s/api/v5/Keywords.json" % self.server.server_address[1]
+        self.local = ILocalData("keywords", "Keywords.json", endpoint)
+        self.local._data_dir_path = self.data_dir + os.sep
+        # The stand-in doesn't publish checksums
+        self.local._require_checksum = False
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def get_paths(self) -> list:
+        return [path for path, _ in StandInHandler.requests]
+
+    def test_downloads_when_no_local_data(self):
+        self.assertTrue(self.local.is_outdated())
+        self.assertEqual(self.get_paths()[:2], ["/api/v5/Meta.json", "/api/v5/Keywords.json"])
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "newKeywords.json")))
+
+    def test_skips_download_when_date_unchanged(self):
+        self.local.update()
+        StandInHandler.requests = []
+        self.assertFalse(self.local.is_outdated())
+        self.assertEqual(self.get_paths(), ["/api/v5/Meta.json"])
+
+    def test_sends_validators_and_skips_transfer_on_304(self):
+        self.local.update()
+        # A newer build date forces a dataset request, but the dataset itself is unchanged
+        StandInHandler.date = "2021-07-01"
+        StandInHandler.requests = []
+        self.assertFalse(self.local.is_outdated())
+        self.assertEqual(StandInHandler.requests[-1], ("/api/v5/Keywords.json", '"v1"'))
+
+    def test_missing_artifact_does_not_hold_connections(self):
+        # Failed responses must hand their connections back, or later fetches would wait on the pool
+        StandInHandler.missing = True
+        checks = Thread(target=lambda: [self.local.is_outdated() for _ in range(6)], daemon=True)
+        checks.start()
+        checks.join(timeout=30)
+        self.assertFalse(checks.is_alive())
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, "newKeywords.json")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from app.mtg_collections.digest import card_id, content_digest
+
+class TestDigest(unittest.TestCase):
+
+    def test_card_id_is_stable(self):
+        # Unlike hash(), the id must not change between processes or runs
+        self.assertEqual(card_id('abc-123', 'Front'), 'a999557cf5bae4e955ab931c7dcf3ef0')
+
+    def test_card_id_distinguishes_faces(self):
+        self.assertNotEqual(card_id('abc-123', 'Front'), card_id('abc-123', 'Back'))
+        self.assertNotEqual(card_id('abc-123'), card_id('abc-123', 'Front'))
+
+    def test_content_digest_ignores_key_order_and_derived_fields(self):
+        card = {"name": "Ornithopter", "manaValue": 0.0, "types": ["Artifact", "Creature"]}
+        reordered = {"types": ["Artifact", "Creature"], "manaValue": 0.0, "name": "Ornithopter",
+                     "_id": card_id('abc-123'), "_digest": "stale"}
+        self.assertEqual(content_digest(card), content_digest(reordered))
+
+    def test_content_digest_changes_with_content(self):
+        card = {"name": "Ornithopter", "text": ""}
+        self.assertNotEqual(content_digest(card), content_digest(dict(card, text="Flying")))
+
+if __name__ == '__main__':
+    unittest.main()
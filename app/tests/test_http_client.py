@@ -0,0 +1,65 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import unittest
+
+from app.mtg_collections.http_client import HttpClient
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    # Answers 503 `failures` times, then 200. Records the client port of each request
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    ports = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.ports.append(self.client_address[1])
+        status = 200
+        if FlakyHandler.failures > 0:
+            FlakyHandler.failures -= 1
+            status = 503
+        body = b"ok" if status == 200 else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class TestHttpClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = "http://127.0.0.1:%s/Meta.json" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FlakyHandler.failures = 0
+        FlakyHandler.ports = []
+        self.client = HttpClient(retries=2, backoff=0)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_reuses_connections(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.url).text, "ok")
+        self.assertEqual(len(set(FlakyHandler.ports)), 1)
+
+    def test_retries_server_errors(self):
+        FlakyHandler.failures = 2
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(len(FlakyHandler.ports), 3)
+
+    def test_returns_last_response_after_retries(self):
+        FlakyHandler.failures = 5
+        self.assertEqual(self.client.get(self.url).status_code, 503)
+        self.assertEqual(len(FlakyHandler.ports), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+import mongomock
+
+from app.mtg_collections.indexes import ensure_indexes, get_plan_stages
+
+class TestIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.specs = {
+            "sets": [{"keys": [("code", 1)], "name": "code_unique", "unique": True}],
+            "AllCards": [{"keys": [("setCode", 1), ("_id", 1)], "name": "setCode_id"}]
+        }
+
+    def test_ensure_indexes_is_idempotent(self):
+        first = ensure_indexes(self.db, self.specs)
+        self.assertEqual(first["sets"]["created"], ["code_unique"])
+        self.assertEqual(first["AllCards"]["created"], ["setCode_id"])
+        second = ensure_indexes(self.db, self.specs)
+        self.assertEqual(second["sets"]["created"], [])
+        self.assertEqual(second["sets"]["existing"], ["code_unique"])
+        self.assertTrue(self.db.sets.index_information()["code_unique"]["unique"])
+
+    def test_unique_index_on_duplicates_is_reported(self):
+        self.db.sets.insert_many([{"code": "M21"}, {"code": "M21"}])
+        report = ensure_indexes(self.db, self.specs)
+        self.assertEqual(report["sets"]["created"], [])
+        self.assertEqual(len(report["sets"]["errors"]), 1)
+
+    def test_conflicting_name_is_not_replaced(self):
+        self.db.sets.create_index([("name", 1)], name="code_unique")
+        report = ensure_indexes(self.db, self.specs)
+        self.assertEqual(report["sets"]["conflicts"], ["code_unique"])
+
+    def test_plan_stages(self):
+        plan = {"stage": "PROJECTION_COVERED", "inputStage": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}
+        self.assertEqual(get_plan_stages(plan), ["PROJECTION_COVERED", "SORT", "COLLSCAN"])
+
+if __name__ == '__main__':
+    unittest.main()
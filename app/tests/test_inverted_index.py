@@ -0,0 +1,82 @@
+import unittest
+
+import mongomock
+
+from app.inverted_index import CardInvertedIndex
+from app.keyword_matcher import KeywordMatcherLoader
+from app.metasyn import color_mask
+
+class TestCardInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        db = mongomock.MongoClient().db
+        db.keywords.insert_many([{"keyword": "Flying"}, {"keyword": "Haste"}])
+        db.types.insert_one({"type": "Creature", "subtypes": ["Elf", "Goblin"]})
+        db.AllCards.insert_many([
+            {"name": "Llanowar Elves", "colorIdentity": ["G"], "types": ["Creature"], "subtypes": ["Elf"],
+                "text": "{T}: Add {G}."},
+            {"name": "Goblin Guide", "colorIdentity": ["R"], "types": ["Creature"], "subtypes": ["Goblin"],
+                "text": "Haste"},
+            # A second printing of the same card
+            {"name": "Goblin Guide", "colorIdentity": ["R"], "types": ["Creature"], "subtypes": ["Goblin"],
+                "text": "Haste"},
+            {"name": "Serra Angel", "colorIdentity": ["W"], "types": ["Creature"], "subtypes": ["Angel"],
+                "keywords": ["Flying", "Vigilance"], "text": "Flying, vigilance"},
+            {"name": "Shock", "colorIdentity": ["R"], "types": ["Instant"], "text": "Shock deals 2 damage to any target."},
+            {"name": "Ornithopter", "colorIdentity": [], "types": ["Artifact", "Creature"], "subtypes": ["Thopter"],
+                "text": "Flying"}
+        ])
+        self.db = db
+        self.index = CardInvertedIndex(db.AllCards, db.types, KeywordMatcherLoader(db.keywords))
+
+    def get_names(self, pool, card_ids) -> list:
+        return sorted(card['name'] for card in pool.get_cards(card_ids))
+
+    def test_postings(self):
+        pool = self.index.get()
+        self.assertEqual(len(pool), 5)
+        flying = pool.keyword_matcher.ids["flying"]
+        self.assertEqual(self.get_names(pool, pool.by_keyword[flying]), ["Ornithopter", "Serra Angel"])
+        self.assertEqual(self.get_names(pool, pool.by_type["Goblin"]), ["Goblin Guide"])
+        # Only types and subtypes known to the types collection are indexed
+        self.assertNotIn("Thopter", pool.by_type)
+        self.assertEqual(self.get_names(pool, pool.by_color[color_mask("R")]), ["Goblin Guide", "Shock"])
+
+    def test_candidates_share_a_keyword_or_subtype(self):
+        pool = self.index.get()
+        keyword_bits = pool.keyword_matcher.bits(["Haste", "Flying"])
+        self.assertEqual(self.get_names(pool, pool.candidates(keyword_bits, ["Elf"])),
+            ["Goblin Guide", "Llanowar Elves", "Ornithopter", "Serra Angel"])
+        cards = pool.get_candidate_cards("Serra Angel", pool.keyword_matcher.bits(["Flying"]))
+        self.assertEqual([card['name'] for card in cards], ["Ornithopter"])
+
+    def test_candidates_fall_back_to_color_identity(self):
+        # Shock has no keywords or subtypes: the cards that fit within its color identity (red or colorless) remain
+        pool = self.index.get()
+        cards = pool.get_candidate_cards("Shock", 0, [], color_mask("R"))
+        self.assertEqual([card['name'] for card in cards], ["Goblin Guide", "Ornithopter"])
+
+    def test_invalidate_rebuilds_from_the_db(self):
+        pool = self.index.get()
+        self.assertIs(self.index.get(), pool)
+        self.db.AllCards.insert_one({"name": "Raging Goblin", "colorIdentity": ["R"], "types": ["Creature"],
+            "subtypes": ["Goblin"], "text": "Haste"})
+        self.index.invalidate()
+        new_pool = self.index.get()
+        self.assertEqual(self.get_names(new_pool, new_pool.by_type["Goblin"]), ["Goblin Guide", "Raging Goblin"])
+        # A snapshot that is already in use is never modified
+        self.assertEqual(self.get_names(pool, pool.by_type["Goblin"]), ["Goblin Guide"])
+
+    def test_refresh_swaps_in_a_new_snapshot(self):
+        pool = self.index.get()
+        self.db.keywords.insert_one({"keyword": "Vigilance"})
+        self.index.keyword_matchers.invalidate()
+        self.index.refresh().join()
+        new_pool = self.index.get()
+        self.assertIsNot(new_pool, pool)
+        vigilance = new_pool.keyword_matcher.ids["vigilance"]
+        self.assertEqual(self.get_names(new_pool, new_pool.by_keyword[vigilance]), ["Serra Angel"])
+        self.assertNotIn("vigilance", pool.keyword_matcher.ids)
+
+if __name__ == '__main__':
+    unittest.main()
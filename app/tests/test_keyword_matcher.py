@@ -0,0 +1,46 @@
+import unittest
+
+import mongomock
+
+from app.keyword_matcher import KeywordMatcher, KeywordMatcherLoader
+
+class TestKeywordMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = KeywordMatcher(["Flash", "Flashback", "Flying", "Landfall", "Scry", "First strike"])
+
+    def test_scan_finds_whole_word_keywords(self):
+        bits = self.matcher.scan("Flying\nLandfall — Whenever a land enters the battlefield under your control, scry 1.")
+        self.assertEqual(self.matcher.names(bits), ["Flying", "Landfall", "Scry"])
+
+    def test_scan_ignores_partial_words(self):
+        self.assertEqual(self.matcher.names(self.matcher.scan("Flashback {2}{R}")), ["Flashback"])
+        self.assertEqual(self.matcher.scan("Flyingfish"), 0)
+
+    def test_scan_matches_overlapping_keywords(self):
+        self.assertEqual(self.matcher.names(self.matcher.scan("first strike, flash")), ["First strike", "Flash"])
+
+    def test_card_bits_includes_listed_keywords(self):
+        bits = self.matcher.card_bits({"text": "Flying", "keywords": ["Scry", "Unknown"]})
+        self.assertEqual(self.matcher.names(bits), ["Flying", "Scry"])
+        self.assertEqual(self.matcher.card_bits({}), 0)
+
+    def test_pack_matches_card_bits(self):
+        cards = [{"text": "Flying"}, {"text": "Flash, scry 2"}]
+        packed = self.matcher.pack(cards)
+        self.assertEqual(packed.shape, (2, self.matcher.width))
+        for row, card in zip(packed, cards):
+            self.assertEqual(int.from_bytes(row.tobytes(), 'little'), self.matcher.card_bits(card))
+
+    def test_loader_builds_on_first_use_and_after_invalidate(self):
+        collection = mongomock.MongoClient().db.keywords
+        loader = KeywordMatcherLoader(collection)
+        collection.insert_one({"keyword": "Flying"})
+        self.assertEqual(loader.get().keywords, ["Flying"])
+        collection.insert_one({"keyword": "Scry"})
+        self.assertIs(loader.get(), loader.get())
+        loader.invalidate()
+        self.assertEqual(loader.get().keywords, ["Flying", "Scry"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.mtg_collections.local_data import ILocalData
+
+def raw_cards(date: str, names: list) -> bytes:
+    # AtomicCards.json as published by mtgjson
+    data = {name: [{"name": name, "text": "Flying", "identifiers": {"scryfallOracleId": "oracle-" + name}}]
+        for name in names}
+    return json.dumps({"meta": {"date": date}, "data": data}).encode()
+
+class TestLocalDataUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.local = ILocalData("cards", "AtomicCards.json", "http://127.0.0.1/api/v5/AtomicCards.json", "msgpack")
+        self.local._data_dir_path = self.data_dir + os.sep
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def write_raw(self, body: bytes) -> None:
+        with open(os.path.join(self.data_dir, "newAtomicCards.json"), 'wb') as f:
+            f.write(body)
+
+    def get_names(self) -> list:
+        return [card['name'] for card in self.local.iter_data()]
+
+    def test_format_and_save(self):
+        self.write_raw(raw_cards("2021-06-01", ["Shock", "Opt"]))
+        self.local.format_and_save()
+        self.assertEqual(self.local.get_date(), "2021-06-01")
+        self.assertEqual(self.get_names(), ["Shock", "Opt"])
+        self.assertEqual(len(self.local.get_card_store().find_by_name("Opt")), 1)
+
+    def test_data_without_manifest_is_outdated(self):
+        self.write_raw(raw_cards("2021-06-01", ["Shock", "Opt"]))
+        self.local.format_and_save()
+        os.remove(os.path.join(self.data_dir, "AtomicCards.msgpack.manifest"))
+        self.assertIsInstance(self.local.get_date(), Exception)
+        self.assertFalse(self.local.verify())
+
+    def test_truncated_raw_data_keeps_previous_data(self):
+        self.write_raw(raw_cards("2021-06-01", ["Shock", "Opt"]))
+        self.local.format_and_save()
+        body = raw_cards("2021-07-01", ["Shock", "Opt", "Ponder", "Brainstorm", "Preordain"])
+        self.write_raw(body[:len(body) // 3])
+        with self.assertRaises(Exception):
+            self.local.format_and_save()
+        self.assertEqual(self.local.get_date(), "2021-06-01")
+        self.assertEqual(self.get_names(), ["Shock", "Opt"])
+        self.assertEqual(os.listdir(self.data_dir).count("AtomicCards.msgpack.tmp"), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from app.metasyn import Utils, color_mask, color_masks, color_synergy
+
+class TestColorSynergy(unittest.TestCase):
+
+    def test_color_mask_accepts_letters_and_names(self):
+        self.assertEqual(color_mask(["B", "R"]), color_mask(["Black", "Red"]))
+        self.assertEqual(color_mask("BR"), color_mask(["B", "R"]))
+        self.assertEqual(color_mask(None), 0)
+
+    def test_non_contiguous_identity_matches_superset_combo(self):
+        synergies = Utils().get_color_synergies(["B", "R"])
+        self.assertTrue(synergies["BGR"])
+        self.assertTrue(synergies["BR"])
+        self.assertFalse(synergies["B"])
+
+    def test_colorless_synergizes_with_all_combos(self):
+        self.assertTrue(all(Utils().get_color_synergies([]).values()))
+        self.assertEqual(color_synergy(0, 0), 31)
+
+    def test_pair_score(self):
+        # Combos containing both B and R: BR, BRW, BRU, BRG, BRUW, BRGW, BRGU, BRGUW
+        self.assertEqual(color_synergy(color_mask("B"), color_mask("R")), 8)
+
+    def test_vectorized_scores_match_pairwise(self):
+        identities = [[], ["W"], ["U", "B"], ["B", "R", "G"], ["W", "U", "B", "R", "G"]]
+        masks = color_masks(identities)
+        scores = color_synergy(color_mask("B"), masks)
+        self.assertIsInstance(scores, np.ndarray)
+        self.assertEqual(list(scores), [color_synergy(color_mask("B"), int(m)) for m in masks])
+
+if __name__ == '__main__':
+    unittest.main()
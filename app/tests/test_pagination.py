@@ -0,0 +1,46 @@
+import json
+import unittest
+
+import mongomock
+from bson import ObjectId
+
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor, iter_ndjson, paginate
+
+class TestPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.AllCards
+        self.collection.insert_many([{"name": "Card %s" % i, "setCode": "M21"} for i in range(5)])
+
+    def get_page(self, limit: int, cursor: str=None) -> tuple:
+        query = {"setCode": "M21"}
+        if cursor:
+            query["_id"] = {"$gt": decode_cursor(cursor)}
+        return paginate(self.collection.find(query, {"name": 1}).sort("_id").limit(limit + 1), limit)
+
+    def test_cursor_round_trip(self):
+        for value in (ObjectId(), "abc", 42):
+            self.assertEqual(decode_cursor(encode_cursor(value)), value)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not a cursor")
+
+    def test_pages_cover_all_documents_once(self):
+        names = []
+        cards, cursor = self.get_page(2)
+        names += [card["name"] for card in cards]
+        while cursor:
+            cards, cursor = self.get_page(2, cursor)
+            names += [card["name"] for card in cards]
+        self.assertEqual(names, ["Card %s" % i for i in range(5)])
+        self.assertTrue(all("_id" not in card for card in cards))
+
+    def test_ndjson_ends_with_next_cursor(self):
+        lines = [json.loads(line) for line in iter_ndjson(self.collection.find({}).sort("_id").limit(4), 3)]
+        self.assertEqual([line["name"] for line in lines[:3]], ["Card 0", "Card 1", "Card 2"])
+        cards, _ = self.get_page(5, lines[3]["nextCursor"])
+        self.assertEqual([card["name"] for card in cards], ["Card 3", "Card 4"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import mongomock
+from flask import Flask, jsonify
+
+from app.response_cache import DataVersion, ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        db = mongomock.MongoClient().db
+        db.sets.insert_many([{"code": "M21"}, {"code": "KHM"}])
+        self.data_version = DataVersion(db.meta, ttl=0)
+        self.calls = 0
+        cache = ResponseCache(self.data_version)
+        flask_app = Flask(__name__)
+
+        @flask_app.route('/api/sets')
+        @cache.cached
+        def sets():
+            self.calls += 1
+            return jsonify(sorted(s['code'] for s in db.sets.find({}, {"_id": 0, "code": 1})))
+
+        self.db = db
+        self.client = flask_app.test_client()
+
+    def test_serves_cached_body_with_etag(self):
+        first = self.client.get('/api/sets')
+        second = self.client.get('/api/sets')
+        self.assertEqual(first.get_json(), ["KHM", "M21"])
+        self.assertEqual(second.data, first.data)
+        self.assertIsNotNone(first.headers.get('ETag'))
+        self.assertEqual(self.calls, 1)
+
+    def test_not_modified(self):
+        etag = self.client.get('/api/sets').headers['ETag']
+        response = self.client.get('/api/sets', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+    def test_version_bump_invalidates(self):
+        etag = self.client.get('/api/sets').headers['ETag']
+        self.db.sets.insert_one({"code": "AFR"})
+        self.data_version.bump()
+        response = self.client.get('/api/sets', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), ["AFR", "KHM", "M21"])
+        self.assertEqual(self.calls, 2)
+
+    def test_version_change_runs_callbacks(self):
+        changes = []
+        self.data_version.on_change(lambda: changes.append(True))
+        self.data_version.get()
+        self.data_version.get()
+        self.assertEqual(changes, [])
+        self.db.meta.update_one({"_id": "data_version"}, {"$inc": {"version": 1}}, upsert=True)
+        self.data_version.get()
+        self.assertEqual(changes, [True])
+
+if __name__ == '__main__':
+    unittest.main()
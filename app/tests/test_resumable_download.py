@@ -0,0 +1,126 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.mtg_collections.local_data import ILocalData
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # Serves Keywords.json.xz with Range support. The first `drops` transfers are cut off halfway
+    protocol_version = "HTTP/1.1"
+    etag = '"v1"'
+    body = lzma.compress(json.dumps({"meta": {"date": "2021-06-01"}, "data": {"abilityWords": ["Landfall"],
+        "keywordAbilities": ["Flying"], "keywordActions": ["Scry"]}}).encode())
+    checksum = hashlib.sha256(body).hexdigest()
+    drops = 0
+    missing = False
+    published = True
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, headers: dict={}) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('Range')))
+        if self.path.endswith("/Meta.json"):
+            return self.send_body(404, b"")
+        if self.path.endswith("/Keywords.json.xz.sha256"):
+            if not self.published:
+                return self.send_body(404, b"")
+            return self.send_body(200, (self.checksum + "\n").encode())
+        if self.missing:
+            return self.send_body(404, b"")
+        start = 0
+        if self.headers.get('Range') and self.headers.get('If-Range') == self.etag:
+            start = int(self.headers['Range'].split("=")[1].rstrip("-"))
+        body = self.body[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        if start:
+            self.send_header("Content-Range", "bytes %s-%s/%s" % (start, len(self.body) - 1, len(self.body)))
+        self.end_headers()
+        if RangeHandler.drops > 0:
+            RangeHandler.drops -= 1
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+class TestResumableDownload(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RangeHandler.requests = []
+        RangeHandler.drops = 0
+        RangeHandler.missing = False
+        RangeHandler.published = True
+        RangeHandler.checksum = hashlib.sha256(RangeHandler.body).hexdigest()
+        self.data_dir = tempfile.mkdtemp()
+        endpoint = "http://127.0.0.1:%s/api/v5/Keywords.json" % self.server.server_address[1]
+        self.local = ILocalData("keywords", "Keywords.json", endpoint, compression="xz")
+        self.local._data_dir_path = self.data_dir + os.sep
+        self.local._download_chunk_size = 16
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def get_data_requests(self) -> list:
+        return [request for request in RangeHandler.requests if request[0].endswith(".xz")]
+
+    def test_resumes_interrupted_download(self):
+        RangeHandler.drops = 2
+        self.assertTrue(self.local.is_outdated())
+        ranges = [byte_range for _, byte_range in self.get_data_requests()]
+        self.assertIsNone(ranges[0])
+        self.assertTrue(all(byte_range.startswith("bytes=") for byte_range in ranges[1:]))
+        self.assertEqual(len(ranges), 3)
+        self.local.format_and_save()
+        self.assertEqual(list(self.local.iter_data()), ['Flying', 'Landfall', 'Scry'])
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, "newKeywords.json.xz.part")))
+
+    def test_rejects_checksum_mismatch(self):
+        RangeHandler.checksum = "0" * 64
+        self.assertFalse(self.local.is_outdated())
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, "newKeywords.json")))
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, "newKeywords.json.xz.part")))
+
+    def test_rejects_unpublished_checksum(self):
+        RangeHandler.published = False
+        self.assertFalse(self.local.is_outdated())
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, "newKeywords.json")))
+        # The complete partial file is kept and verified on the next check
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "newKeywords.json.xz.part")))
+        RangeHandler.published = True
+        self.assertTrue(self.local.is_outdated())
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "newKeywords.json")))
+
+    def test_does_not_retry_missing_artifact(self):
+        RangeHandler.missing = True
+        self.assertFalse(self.local.is_outdated())
+        self.assertEqual(len(self.get_data_requests()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from app.mtg_collections.scheduler import UpdateScheduler
+
+class FakeLocalData():
+    def __init__(self, category: str, data_dir_path: str, outdated: bool):
+        self.category = category
+        self.file_name = category + ".json"
+        self.endpoint = "http://127.0.0.1/api/v5/" + self.file_name
+        self._data_dir_path = data_dir_path
+        self.outdated = outdated
+
+    def is_outdated(self) -> bool:
+        return self.outdated
+
+class FakeUpdater():
+    _storage_format = "json"
+
+    def __init__(self, category: str, data_dir_path: str, synced: list, outdated: bool=False, delay: float=0):
+        self.local = FakeLocalData(category, data_dir_path, outdated)
+        self.synced = synced
+        self.delay = delay
+
+    def sync(self) -> dict:
+        time.sleep(self.delay)
+        self.synced.append(self.local.category)
+        return {}
+
+class TestUpdateScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp() + "/"
+        self.synced = []
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_cards_sync_after_sets(self):
+        updaters = {
+            "cards": FakeUpdater("cards", self.data_dir, self.synced),
+            "sets": FakeUpdater("sets", self.data_dir, self.synced, delay=0.2),
+            "keywords": FakeUpdater("keywords", self.data_dir, self.synced)
+        }
+        scheduler = UpdateScheduler(updaters, cpu_workers=1)
+        scheduler.run()
+        self.assertEqual(scheduler.errors, {})
+        self.assertLess(self.synced.index("sets"), self.synced.index("cards"))
+        self.assertEqual(set(self.synced), set(updaters))
+
+    def test_format_failure_skips_that_sync(self):
+        # The sets data is outdated but was never downloaded, so formatting it fails in the worker process
+        updaters = {
+            "sets": FakeUpdater("sets", self.data_dir, self.synced, outdated=True),
+            "keywords": FakeUpdater("keywords", self.data_dir, self.synced)
+        }
+        scheduler = UpdateScheduler(updaters, cpu_workers=1)
+        timings = scheduler.run()
+        self.assertEqual(list(scheduler.errors), ["sets"])
+        self.assertIn("Unable to format data", str(scheduler.errors["sets"]))
+        self.assertNotIn("sync", timings["sets"])
+        self.assertEqual(self.synced, ["keywords"])
+
+if __name__ == '__main__':
+    unittest.main()
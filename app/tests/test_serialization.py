@@ -0,0 +1,47 @@
+from collections import namedtuple
+import gzip
+import json
+import unittest
+
+from flask import Flask
+
+from app.serialization import compress_response, dumps, json_response
+
+Synergy = namedtuple('Synergy', 'color keywords overall')
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        flask_app = Flask(__name__)
+        flask_app.config.update(COMPRESSION_MIN_SIZE=100, COMPRESSION_GZIP_LEVEL=6, COMPRESSION_BROTLI_QUALITY=5)
+        flask_app.after_request(compress_response)
+        self.cards = [{"name": "Card %s" % i, "text": "Flying, haste"} for i in range(50)]
+
+        @flask_app.route('/cards')
+        def cards():
+            return json_response(self.cards)
+
+        @flask_app.route('/small')
+        def small():
+            return json_response([1])
+
+        self.client = flask_app.test_client()
+
+    def test_dumps_namedtuples_as_lists(self):
+        self.assertEqual(json.loads(dumps([["Card", Synergy(1, 2, 3.5)]])), [["Card", [1, 2, 3.5]]])
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get('/cards', headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.data)), self.cards)
+
+    def test_identity_when_not_accepted_or_small(self):
+        response = self.client.get('/cards')
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_json(), self.cards)
+        response = self.client.get('/small', headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from app.mtg_collections.storage import get_storage
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.meta = {"date": "2026-10-01"}
+        self.cards = [{"name": "Llanowar Elves", "manaValue": 1.0, "colorIdentity": ["G"]}, {"name": "Ornithopter"}]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def round_trip(self, storage_format: str):
+        storage = get_storage(storage_format)
+        path = os.path.join(self.tmp_dir.name, "AtomicCards" + storage.extension)
+        checksum = storage.write(path, self.meta, "cards", iter(self.cards))
+        with open(path, 'rb') as f:
+            self.assertEqual(checksum, hashlib.sha256(f.read()).hexdigest())
+        self.assertEqual(storage.read_meta(path), self.meta)
+        self.assertEqual(list(storage.iter_items(path, "cards")), self.cards)
+        self.assertEqual(storage.load(path, "cards"), self.cards)
+
+    def test_json_round_trip(self):
+        self.round_trip("json")
+
+    def test_msgpack_round_trip(self):
+        self.round_trip("msgpack")
+
+    def interrupted_write(self, storage_format: str):
+        storage = get_storage(storage_format)
+        path = os.path.join(self.tmp_dir.name, "AtomicCards" + storage.extension)
+        storage.write(path, self.meta, "cards", iter(self.cards))
+        def failing_items():
+            yield self.cards[0]
+            raise ValueError("Stream cut off")
+        with self.assertRaises(ValueError):
+            storage.write(path, {"date": "2026-11-01"}, "cards", failing_items())
+        # The previous file is left whole and no scratch file remains
+        self.assertEqual(storage.read_meta(path), self.meta)
+        self.assertEqual(list(storage.iter_items(path, "cards")), self.cards)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["AtomicCards" + storage.extension])
+
+    def test_json_interrupted_write(self):
+        self.interrupted_write("json")
+
+    def test_msgpack_interrupted_write(self):
+        self.interrupted_write("msgpack")
+
+    def test_unknown_format(self):
+        with self.assertRaises(KeyError):
+            get_storage("xml")
+
+if __name__ == '__main__':
+    unittest.main()
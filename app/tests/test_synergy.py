@@ -0,0 +1,45 @@
+import unittest
+
+from app.card_index import CardProfile
+from app.keyword_matcher import KeywordMatcher
+from app.synergy import CardSynergy, top_synergy_scores
+
+class TestCardSynergy(unittest.TestCase):
+
+    def setUp(self):
+        matcher = KeywordMatcher(["Flying", "Haste", "Trample", "Vigilance", "Landfall"])
+        selected_card = CardProfile({"name": "Atarka", "colorIdentity": ["G", "R"], "colors": ["G", "R"],
+            "types": ["Creature"], "subtypes": ["Dragon"], "text": "Flying, trample"})
+        self.synergy = CardSynergy(selected_card, matcher)
+        self.comp_cards = [
+            {"name": "Shivan Dragon", "colors": ["R"], "text": "Flying"},
+            {"name": "Serra Angel", "colors": ["W"], "text": "Flying, vigilance"},
+            {"name": "Colossal Dreadmaw", "colors": ["G"], "text": "Trample"},
+            {"name": "Ornithopter", "colors": [], "text": "Flying"},
+            {"name": "Thundermaw Hellkite", "colors": ["R"], "keywords": ["Haste"], "text": "Flying, haste"},
+            {"name": "Lotus Cobra", "colors": ["G"], "text": "Landfall — Add one mana of any color."},
+            {"name": "Esper Charm", "colors": ["W", "U", "B"], "text": "Choose one"}
+        ]
+
+    def test_batch_scores_match_per_card_scores(self):
+        results = self.synergy.get_batch_synergy_scores(self.comp_cards)
+        expected = [(card['name'], self.synergy.get_relative_synergy_scores(card)) for card in self.comp_cards]
+        # Sorted by overall score; ties keep the order the cards were sent in
+        expected.sort(key=lambda result: result[1].overall)
+        self.assertEqual(results, expected)
+
+    def test_batch_scores_of_no_cards(self):
+        self.assertEqual(self.synergy.get_batch_synergy_scores([]), [])
+
+    def test_top_synergy_scores(self):
+        results = self.synergy.get_batch_synergy_scores(self.comp_cards)
+        top = top_synergy_scores(results, 3)
+        # Highest scores, still sorted ascending, with ties going to the card sent first
+        order = [card['name'] for card in self.comp_cards]
+        expected = sorted(results, key=lambda result: (-result[1].overall, order.index(result[0])))[:3]
+        expected.sort(key=lambda result: result[1].overall)
+        self.assertEqual([name for name, _ in top], [name for name, _ in expected])
+        self.assertEqual(top_synergy_scores(results, 100), results)
+
+if __name__ == '__main__':
+    unittest.main()
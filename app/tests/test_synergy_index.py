@@ -0,0 +1,85 @@
+import unittest
+
+import mongomock
+
+from app.card_index import CardProfile
+from app.inverted_index import CardInvertedIndex
+from app.keyword_matcher import KeywordMatcherLoader
+from app.synergy import CardSynergy, top_synergy_scores
+from app.synergy_index import SynergyIndex, SynergyIndexBuilder
+
+class TestSynergyIndex(unittest.TestCase):
+
+    def setUp(self):
+        db = mongomock.MongoClient().db
+        db.keywords.insert_many([{"keyword": "Flying"}, {"keyword": "Haste"}, {"keyword": "Trample"}])
+        db.types.insert_one({"type": "Creature", "subtypes": ["Elf", "Goblin", "Dragon"]})
+        db.AllCards.insert_many([
+            {"name": "Llanowar Elves", "colorIdentity": ["G"], "colors": ["G"], "subtypes": ["Elf"], "text": ""},
+            {"name": "Elvish Mystic", "colorIdentity": ["G"], "colors": ["G"], "subtypes": ["Elf"], "text": ""},
+            {"name": "Goblin Guide", "colorIdentity": ["R"], "colors": ["R"], "subtypes": ["Goblin"], "text": "Haste"},
+            {"name": "Raging Goblin", "colorIdentity": ["R"], "colors": ["R"], "subtypes": ["Goblin"], "text": "Haste"},
+            {"name": "Shivan Dragon", "colorIdentity": ["R"], "colors": ["R"], "subtypes": ["Dragon"],
+                "text": "Flying"},
+            {"name": "Atarka", "colorIdentity": ["G", "R"], "colors": ["G", "R"], "subtypes": ["Dragon"],
+                "text": "Flying, trample"},
+            {"name": "Serra Angel", "colorIdentity": ["W"], "colors": ["W"], "text": "Flying, vigilance"},
+            {"name": "Shock", "colorIdentity": ["R"], "colors": ["R"], "text": "Shock deals 2 damage to any target."},
+            {"name": "Ornithopter", "colorIdentity": [], "colors": [], "text": "Flying"}
+        ])
+        self.db = db
+        self.pool = CardInvertedIndex(db.AllCards, db.types, KeywordMatcherLoader(db.keywords)).get()
+        self.index = SynergyIndex(db.synergies, k=3)
+
+    def build(self, k: int=3) -> int:
+        return SynergyIndexBuilder(self.pool, self.db.synergies, k, block_size=4).build()
+
+    def live_scores(self, card: dict, comp_cards: list=None) -> list:
+        # What /api/synergize computes when the index doesn't answer
+        selected_card = CardProfile(card)
+        synergy = CardSynergy(selected_card, self.pool.keyword_matcher)
+        if comp_cards is None:
+            comp_cards = self.pool.get_candidate_cards(selected_card.name, synergy.selected_keywords,
+                selected_card.subtypes, selected_card.color_mask)
+            return top_synergy_scores(synergy.get_batch_synergy_scores(comp_cards), self.index.k)
+        return synergy.get_batch_synergy_scores(comp_cards)
+
+    def test_top_k_matches_live_scores(self):
+        self.assertEqual(self.build(), len(self.pool))
+        for card in self.pool.cards:
+            self.assertEqual(self.index.lookup(card['name']), self.live_scores(card), card['name'])
+
+    def test_comp_cards_match_batch_scores(self):
+        self.build(k=len(self.pool))
+        self.index.k = len(self.pool)
+        shivan = self.pool.cards[4]
+        comp_cards = [self.pool.cards[5], self.pool.cards[8], self.pool.cards[6]]
+        self.assertEqual(self.index.lookup(shivan['name'], comp_cards), self.live_scores(shivan, comp_cards))
+
+    def test_selected_card_is_left_out_of_comp_cards(self):
+        self.build(k=len(self.pool))
+        self.index.k = len(self.pool)
+        shivan = self.pool.cards[4]
+        results = self.index.lookup(shivan['name'], [shivan, self.pool.cards[5]])
+        self.assertEqual([name for name, _ in results], ["Atarka"])
+
+    def test_uncovered_requests_fall_through(self):
+        self.build()
+        shivan = self.pool.cards[4]
+        # Not one of Shivan Dragon's top 3
+        self.assertIsNone(self.index.lookup(shivan['name'], [self.pool.cards[0]]))
+        # More cards than the index holds per card
+        self.assertIsNone(self.index.lookup(shivan['name'], self.pool.cards[:4]))
+        self.assertIsNone(self.index.lookup("Black Lotus"))
+
+    def test_rebuild_replaces_the_index(self):
+        self.build()
+        self.db.AllCards.delete_many({"name": {"$ne": "Shock"}})
+        self.pool = CardInvertedIndex(self.db.AllCards, self.db.types, KeywordMatcherLoader(self.db.keywords)).get()
+        self.assertEqual(self.build(), 1)
+        self.assertEqual(self.db.synergies.count_documents({}), 1)
+        self.assertEqual(self.index.lookup("Shock"), [])
+        self.assertNotIn("synergies_build", self.db.list_collection_names())
+
+if __name__ == '__main__':
+    unittest.main()
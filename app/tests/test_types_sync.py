@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mongomock
+
+from app.mtg_collections.mtg_types import TypesUpdater
+
+class TestTypesSync(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.collection = mongomock.MongoClient().db.types
+        self.collection.insert_many([
+            {"type": "creature", "subtypes": ["Elf"], "supertypes": ["Legendary"]},
+            {"type": "instant", "subtypes": [], "supertypes": []}
+        ])
+        self.updater = TypesUpdater(self.collection)
+        self.updater._bulk_workers = 1
+        self.updater.local._data_dir_path = self.data_dir + os.sep
+        # CardTypes.json as published by mtgjson
+        raw_types = {
+            "creature": {"subTypes": ["Elf", "Goblin"], "superTypes": ["Legendary", "Snow"]},
+            "instant": {"subTypes": ["Arcane"], "superTypes": []},
+            "battle": {"subTypes": ["Siege"], "superTypes": []}
+        }
+        with open(os.path.join(self.data_dir, "newCardTypes.json"), 'w') as f:
+            f.write(json.dumps({"meta": {"date": "2021-06-01"}, "data": raw_types}))
+        self.updater.local.format_and_save()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def get_type(self, card_type: str) -> dict:
+        return self.collection.find_one({"type": card_type}, {"_id": 0})
+
+    def test_get_items_to_update(self):
+        new_attributes = sorted(self.updater.get_items_to_update(), key=lambda attributes: attributes['type'])
+        # Battle is not in the DB yet, so it is left to get_items_to_add()
+        self.assertEqual(new_attributes, [
+            {"type": "creature", "subtypes": ["Goblin"], "supertypes": ["Snow"]},
+            {"type": "instant", "subtypes": ["Arcane"], "supertypes": []}
+        ])
+
+    def test_update_items_adds_only_new_subtypes(self):
+        self.updater.get_items_to_update()
+        report = self.updater.update_items()
+        self.assertEqual(report.get_totals()["modified"], 2)
+        self.assertEqual(self.get_type("creature"),
+            {"type": "creature", "subtypes": ["Elf", "Goblin"], "supertypes": ["Legendary", "Snow"]})
+        self.assertEqual(self.get_type("instant"), {"type": "instant", "subtypes": ["Arcane"], "supertypes": []})
+        # A second diff finds nothing left to add
+        self.assertEqual(self.updater.get_items_to_update(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mongomock
+
+from app.mtg_collections.mtg_keywords import KeywordsUpdater
+from app.mtg_collections.mtg_sets import SetsUpdater
+
+class TestUpdateDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.db = mongomock.MongoClient().db
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def format(self, updater, raw_data: dict) -> None:
+        updater.local._data_dir_path = self.data_dir + os.sep
+        file_name = "new" + updater.get_local_file_name()
+        with open(os.path.join(self.data_dir, file_name), 'w') as f:
+            f.write(json.dumps({"meta": {"date": "2021-06-01"}, "data": raw_data}))
+        updater.local.format_and_save()
+
+    def get_sets_updater(self) -> SetsUpdater:
+        self.db.sets.insert_many([
+            {"code": "M21", "name": "Core Set 2021"},
+            {"code": "KHM", "name": "Kaldheim (old name)"},
+            {"code": "LEA", "name": "Limited Edition Alpha"}
+        ])
+        updater = SetsUpdater(self.db.sets)
+        self.format(updater, [
+            {"code": "M21", "name": "Core Set 2021"},
+            {"code": "KHM", "name": "Kaldheim"},
+            {"code": "STX", "name": "Strixhaven: School of Mages"}
+        ])
+        return updater
+
+    def test_iter_coll_keys(self):
+        updater = SetsUpdater(self.db.sets)
+        self.db.sets.insert_many([{"code": "M21"}, {"code": "KHM"}, {"name": "No code"}])
+        self.assertEqual(sorted(updater.iter_coll_keys()), ["KHM", "M21"])
+
+    def test_diff_local_data(self):
+        updater = self.get_sets_updater()
+        new_items, stale_keys = updater.diff_local_data()
+        # Only keys are compared, so a changed set with an existing code is neither new nor stale
+        self.assertEqual([card_set['code'] for card_set in new_items], ["STX"])
+        self.assertEqual(stale_keys, {"LEA"})
+
+    def test_get_items_to_add(self):
+        updater = self.get_sets_updater()
+        self.assertEqual(updater.get_items_to_add(), [{"code": "STX", "name": "Strixhaven: School of Mages"}])
+        self.assertEqual(updater.stale_items, {"LEA"})
+
+    def test_keywords_to_document(self):
+        self.db.keywords.insert_many([{"keyword": "Flying"}, {"keyword": "Banding"}])
+        updater = KeywordsUpdater(self.db.keywords)
+        self.format(updater, {"abilityWords": ["Landfall"], "keywordAbilities": ["Flying", "Ward"],
+            "keywordActions": ["Scry"]})
+        self.assertEqual(updater.to_document("Ward"), {"keyword": "Ward"})
+        self.assertEqual(updater.get_items_to_add(), [{"keyword": "Landfall"}, {"keyword": "Scry"}, {"keyword": "Ward"}])
+        self.assertEqual(updater.stale_items, {"Banding"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,7 @@
-from app import app
+from app import app, card_pool
+
+# Build the in-memory card indexes in the background, so the first /api/synergize doesn't wait for them
+card_pool.warm()
 
 if __name__ == '__main__':
     app.run(debug=True)